@@ -9,35 +9,117 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
-import json
 import os
 import logging
+import tempfile
+from os import environ as _ENV
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
 
 logger = logging.getLogger(__name__)
 
+# Use orjson for config I/O when available, fallback to stdlib json
+try:
+    import orjson
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+# Sentinel for "not resolved yet" so a legitimate None result is still cached
+_UNSET = object()
+
+_GATEWAY_SCHEMES = frozenset({"http", "https"})
+
+
+def validate_gateway_url(address: str) -> Optional[Tuple[str, str]]:
+    """
+    Validate a gateway address (shared by the wizard and the settings dialog)
+    
+    Accepts http(s)://host[:port][/path] with a non-empty host, a valid
+    port if one is given, and no whitespace in the host part.
+    
+    Returns:
+        Tuple of (scheme, netloc) for a valid address, otherwise None
+    """
+    try:
+        parts = urlsplit(address)
+        # .port raises ValueError for a non-numeric or out-of-range port
+        parts.port
+    except ValueError:
+        return None
+    if (parts.scheme not in _GATEWAY_SCHEMES or not parts.hostname
+            or any(c.isspace() for c in parts.netloc)):
+        return None
+    return parts.scheme, parts.netloc
+
 
 class ErikaConfigManager:
     """Manages Erika application configuration"""
     
-    def __init__(self):
-        self.config_path = Path.home() / ".erika" / "config.json"
-        self._config = None
-        self._load_config()
+    def __init__(self, config_path: Optional[Path] = None):
+        """
+        Args:
+            config_path: Config file location (default: ~/.erika/config.json)
+        """
+        self.config_path = config_path or Path.home() / ".erika" / "config.json"
+        self._config: Dict[str, Any] = {}
+        self._loaded = False
+        self._gateway_url_cache = _UNSET
+        self._database_url_cache = _UNSET
+    
+    def _ensure_loaded(self):
+        """Load configuration file on first access"""
+        if not self._loaded:
+            self._load_config()
+            self._loaded = True
     
     def _load_config(self):
         """Load configuration from file"""
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r') as f:
-                    self._config = json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load config: {e}")
-                self._config = {}
-        else:
+        try:
+            self._config = _loads(self.config_path.read_bytes())
+        except FileNotFoundError:
+            self._config = {}
+        except Exception as e:
+            logger.warning(f"Could not load config: {e}")
             self._config = {}
     
+    def _write_config(self):
+        """Write configuration atomically (fsynced temp file + rename)"""
+        # Ensure directory exists
+        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        tmp_file = tempfile.NamedTemporaryFile(
+            dir=self.config_path.parent,
+            prefix=self.config_path.name,
+            suffix='.tmp',
+            delete=False
+        )
+        tmp_path = Path(tmp_file.name)
+        try:
+            with tmp_file:
+                tmp_file.write(_dumps(self._config))
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+            raise
+    
     def get_gateway_url(self) -> str:
         """
         Get EgoLlama Gateway URL
@@ -50,47 +132,69 @@ class ErikaConfigManager:
         Returns:
             Gateway URL string
         """
-        # Check environment variable first
-        env_url = os.getenv('EGOLLAMA_GATEWAY_URL')
-        if env_url:
-            return env_url
+        if self._gateway_url_cache is not _UNSET:
+            return self._gateway_url_cache
         
-        # Check config file
-        if self._config:
-            config_url = self._config.get('egollama_gateway_url')
-            if config_url:
-                return config_url
+        # Environment variable first, then config file, then default
+        url = _ENV.get('EGOLLAMA_GATEWAY_URL')
+        if not url:
+            self._ensure_loaded()
+            url = self._config.get('egollama_gateway_url') or "http://localhost:8082"
         
-        # Default
-        return "http://localhost:8082"
+        self._gateway_url_cache = url
+        return url
     
     def set_gateway_url(self, url: str):
         """Set gateway URL in config file"""
-        if not self._config:
-            self._config = {}
+        self.update(gateway_url=url)
+    
+    def update(self, gateway_url: Optional[str] = None, database_url: Optional[str] = None):
+        """
+        Set several settings with a single config file write
         
-        self._config['egollama_gateway_url'] = url
-        self._config['configured'] = True
+        Args:
+            gateway_url: New gateway URL (None leaves it unchanged)
+            database_url: New database URL (None leaves it unchanged)
+        """
+        self._ensure_loaded()
+        config = self._config
+        changed = False
         
-        # Ensure directory exists
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        if gateway_url is not None and not (
+            config.get('egollama_gateway_url') == gateway_url and config.get('configured')
+        ):
+            config['egollama_gateway_url'] = gateway_url
+            config['configured'] = True
+            # Re-resolve on next read (environment variable still wins)
+            self._gateway_url_cache = _UNSET
+            changed = True
+        
+        if database_url is not None and config.get('database_url') != database_url:
+            config['database_url'] = database_url
+            self._database_url_cache = _UNSET
+            changed = True
+        
+        # Nothing to write if every value is unchanged
+        if not changed:
+            return
         
         # Save
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self._config, f, indent=2)
-            logger.info(f"✅ Saved gateway URL: {url}")
+            self._write_config()
+            logger.info("✅ Saved configuration")
         except Exception as e:
             logger.error(f"Failed to save config: {e}")
             raise
     
     def is_configured(self) -> bool:
         """Check if configuration exists"""
-        return self._config.get('configured', False) if self._config else False
+        self._ensure_loaded()
+        return self._config.get('configured', False)
     
     def get_config(self) -> Dict[str, Any]:
         """Get full configuration dictionary"""
-        return self._config.copy() if self._config else {}
+        self._ensure_loaded()
+        return dict(self._config)
     
     def get_database_url(self) -> Optional[str]:
         """
@@ -104,33 +208,19 @@ class ErikaConfigManager:
         Returns:
             Database URL string or None
         """
-        # Check environment variable first
-        env_url = os.getenv('DATABASE_URL')
-        if env_url:
-            return env_url
+        if self._database_url_cache is not _UNSET:
+            return self._database_url_cache
         
-        # Check config file
-        if self._config:
-            return self._config.get('database_url')
+        # Environment variable first, then config file
+        url = _ENV.get('DATABASE_URL')
+        if not url:
+            self._ensure_loaded()
+            url = self._config.get('database_url')
         
-        return None
+        self._database_url_cache = url
+        return url
     
     def set_database_url(self, url: str):
         """Set database URL in config file"""
-        if not self._config:
-            self._config = {}
-        
-        self._config['database_url'] = url
-        
-        # Ensure directory exists
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Save
-        try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self._config, f, indent=2)
-            logger.info("✅ Saved database URL")
-        except Exception as e:
-            logger.error(f"Failed to save config: {e}")
-            raise
+        self.update(database_url=url)
 
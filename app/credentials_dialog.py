@@ -17,13 +17,98 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QCheckBox, QMessageBox, QGroupBox, QTextEdit
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QFont
 
 from .database_service import ErikaDatabaseService
 
 logger = logging.getLogger(__name__)
 
+# Optional Google OAuth2 / Gmail dependencies (resolved once at import time)
+try:
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    _OAUTH_AVAILABLE = True
+except ImportError:
+    InstalledAppFlow = None
+    _OAUTH_AVAILABLE = False
+
+try:
+    from erika.plugins.email import ErikaGmailService
+    _GMAIL_SERVICE_AVAILABLE = True
+except ImportError:
+    ErikaGmailService = None
+    _GMAIL_SERVICE_AVAILABLE = False
+
+# Request both readonly (for scanning) and modify (for mitigation)
+_GMAIL_SCOPES = (
+    'https://www.googleapis.com/auth/gmail.readonly',
+    'https://www.googleapis.com/auth/gmail.modify',
+)
+
+
+def _nonblank(text: str) -> bool:
+    """Check text has a non-whitespace character (without allocating a stripped copy)"""
+    return bool(text) and not text.isspace()
+
+# Stylesheets (built once at import time)
+_INSTRUCTIONS_QSS = """
+    QTextEdit {
+        background: #f5f5f5;
+        border: 1px solid #ddd;
+        border-radius: 4px;
+        padding: 10px;
+    }
+"""
+
+_STATUS_INFO_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #e3f2fd;
+    color: #1976d2;
+"""
+
+_STATUS_CONFIGURED_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #e8f5e9;
+    color: #2e7d32;
+"""
+
+_STATUS_UNCONFIGURED_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #fff3e0;
+    color: #f57c00;
+"""
+
+_SAVE_BTN_QSS = """
+    QPushButton {
+        background: #4CAF50;
+        color: white;
+        padding: 10px 25px;
+        border-radius: 5px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background: #45a049;
+    }
+    QPushButton:pressed {
+        background: #3d8b40;
+    }
+"""
+
+_CANCEL_BTN_QSS = """
+    QPushButton {
+        background: #f44336;
+        color: white;
+        padding: 10px 25px;
+        border-radius: 5px;
+    }
+    QPushButton:hover {
+        background: #da190b;
+    }
+"""
+
 
 class ErikaCredentialsDialog(QDialog):
     """Dialog for configuring Erika's Gmail OAuth2 credentials"""
@@ -31,12 +116,33 @@ class ErikaCredentialsDialog(QDialog):
     # Signal emitted when credentials are saved
     credentials_saved = pyqtSignal()
     
+    # Shared title font (created on first use, needs a QGuiApplication)
+    _TITLE_FONT = None
+    
+    @classmethod
+    def _get_title_font(cls) -> QFont:
+        """Get the shared title font"""
+        if cls._TITLE_FONT is None:
+            font = QFont()
+            font.setPointSize(16)
+            font.setBold(True)
+            cls._TITLE_FONT = font
+        return cls._TITLE_FONT
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.db_service = ErikaDatabaseService()
+        self._email_config_cache = None
         self.setWindowTitle("🌿 Erika - Gmail API Configuration")
         self.setMinimumWidth(650)
         self.setModal(True)
+        
+        # Collapse bursts of textChanged signals into one check_inputs call
+        self._check_timer = QTimer(self)
+        self._check_timer.setSingleShot(True)
+        self._check_timer.setInterval(50)
+        self._check_timer.timeout.connect(self.check_inputs)
+        
         self.setup_ui()
         self.load_config()
     
@@ -48,10 +154,7 @@ class ErikaCredentialsDialog(QDialog):
         
         # Title
         title = QLabel("Gmail OAuth2 Configuration")
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(self._get_title_font())
         layout.addWidget(title)
         
         # Instructions
@@ -68,14 +171,7 @@ class ErikaCredentialsDialog(QDialog):
             "5. Application type: Desktop app\n"
             "6. Copy the Client ID and Client Secret below"
         )
-        instructions_text.setStyleSheet("""
-            QTextEdit {
-                background: #f5f5f5;
-                border: 1px solid #ddd;
-                border-radius: 4px;
-                padding: 10px;
-            }
-        """)
+        instructions_text.setStyleSheet(_INSTRUCTIONS_QSS)
         layout.addWidget(instructions_text)
         
         # Credentials Group
@@ -128,12 +224,7 @@ class ErikaCredentialsDialog(QDialog):
         
         # Status display
         self.status_label = QLabel()
-        self.status_label.setStyleSheet("""
-            padding: 10px;
-            border-radius: 4px;
-            background: #e3f2fd;
-            color: #1976d2;
-        """)
+        self.status_label.setStyleSheet(_STATUS_INFO_QSS)
         self.update_status_text()
         layout.addWidget(self.status_label)
         
@@ -153,82 +244,58 @@ class ErikaCredentialsDialog(QDialog):
         button_layout.addWidget(self.refresh_token_btn)
         
         self.save_btn = QPushButton("💾 Save")
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background: #4CAF50;
-                color: white;
-                padding: 10px 25px;
-                border-radius: 5px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: #45a049;
-            }
-            QPushButton:pressed {
-                background: #3d8b40;
-            }
-        """)
+        self.save_btn.setStyleSheet(_SAVE_BTN_QSS)
         self.save_btn.setToolTip("Save credentials to database")
         self.save_btn.clicked.connect(self.save_credentials)
         button_layout.addWidget(self.save_btn)
         
         self.cancel_btn = QPushButton("❌ Cancel")
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background: #f44336;
-                color: white;
-                padding: 10px 25px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background: #da190b;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(_CANCEL_BTN_QSS)
         self.cancel_btn.clicked.connect(self.reject)
         button_layout.addWidget(self.cancel_btn)
         
         layout.addLayout(button_layout)
         
-        # Enable test button when both fields filled
-        self.client_id_input.textChanged.connect(self.check_inputs)
-        self.client_secret_input.textChanged.connect(self.check_inputs)
+        # Enable test button when both fields filled (debounced)
+        self.client_id_input.textChanged.connect(self._schedule_check_inputs)
+        self.client_secret_input.textChanged.connect(self._schedule_check_inputs)
+    
+    def _schedule_check_inputs(self, _text: str = ""):
+        """(Re)start the debounce timer for check_inputs"""
+        self._check_timer.start()
     
     def check_inputs(self):
         """Enable/disable test button based on input"""
-        has_client_id = bool(self.client_id_input.text().strip())
-        has_secret = bool(self.client_secret_input.text().strip())
-        self.test_btn.setEnabled(has_client_id and has_secret)
+        self.test_btn.setEnabled(
+            _nonblank(self.client_id_input.text()) and _nonblank(self.client_secret_input.text())
+        )
     
     def toggle_password_visibility(self, state):
         """Toggle password visibility"""
-        if state == Qt.CheckState.Checked:
-            self.client_secret_input.setEchoMode(QLineEdit.EchoMode.Normal)
-        else:
-            self.client_secret_input.setEchoMode(QLineEdit.EchoMode.Password)
+        echo_mode = QLineEdit.EchoMode
+        self.client_secret_input.setEchoMode(
+            echo_mode.Normal if state == Qt.CheckState.Checked else echo_mode.Password
+        )
+    
+    def _email_config(self) -> dict:
+        """Get stored email configuration (cached for the dialog's lifetime)"""
+        if self._email_config_cache is None:
+            self._email_config_cache = self.db_service.get_email_config(user_id="default") or {}
+        return self._email_config_cache
     
     def update_status_text(self):
         """Update status display"""
-        config = self.db_service.get_email_config(user_id="default")
+        config = self._email_config()
         if config and config.get('gmail_client_id'):
             self.status_label.setText("✅ Credentials are configured")
-            self.status_label.setStyleSheet("""
-                padding: 10px;
-                border-radius: 4px;
-                background: #e8f5e9;
-                color: #2e7d32;
-            """)
+            self.status_label.setStyleSheet(_STATUS_CONFIGURED_QSS)
         else:
             self.status_label.setText("⚠️ No credentials configured")
-            self.status_label.setStyleSheet("""
-                padding: 10px;
-                border-radius: 4px;
-                background: #fff3e0;
-                color: #f57c00;
-            """)
+            self.status_label.setStyleSheet(_STATUS_UNCONFIGURED_QSS)
     
     def load_config(self):
         """Load existing configuration"""
-        config = self.db_service.get_email_config(user_id="default")
+        config = self._email_config()
         if config:
             self.client_id_input.setText(config.get('gmail_client_id', ''))
             self.client_secret_input.setText(config.get('gmail_client_secret', ''))
@@ -252,10 +319,12 @@ class ErikaCredentialsDialog(QDialog):
                               "Client ID should end with '.apps.googleusercontent.com'")
             return
         
+        if not _OAUTH_AVAILABLE:
+            self._warn_missing_dependencies()
+            return
+        
         # Try to authenticate
         try:
-            from google_auth_oauthlib.flow import InstalledAppFlow
-            
             client_config = {
                 "installed": {
                     "client_id": client_id,
@@ -266,14 +335,8 @@ class ErikaCredentialsDialog(QDialog):
                 }
             }
             
-            # Request both readonly (for scanning) and modify (for mitigation)
-            SCOPES = [
-                'https://www.googleapis.com/auth/gmail.readonly',
-                'https://www.googleapis.com/auth/gmail.modify'
-            ]
-            
             # This will validate the config structure
-            flow = InstalledAppFlow.from_client_config(client_config, SCOPES)
+            flow = InstalledAppFlow.from_client_config(client_config, _GMAIL_SCOPES)
             
             QMessageBox.information(
                 self, 
@@ -283,14 +346,6 @@ class ErikaCredentialsDialog(QDialog):
                 "you'll be asked to authenticate with Google in your browser."
             )
             
-        except ImportError:
-            QMessageBox.warning(
-                self,
-                "Missing Dependencies",
-                "Google OAuth2 libraries not installed.\n\n"
-                "Please install: google-auth-oauthlib\n"
-                "Command: pip install google-auth-oauthlib"
-            )
         except Exception as e:
             logger.error(f"Test credentials error: {e}")
             QMessageBox.critical(
@@ -300,6 +355,16 @@ class ErikaCredentialsDialog(QDialog):
                 "Please verify your Client ID and Client Secret from Google Cloud Console."
             )
     
+    def _warn_missing_dependencies(self):
+        """Tell the user the Google OAuth2 libraries are missing"""
+        QMessageBox.warning(
+            self,
+            "Missing Dependencies",
+            "Google OAuth2 libraries not installed.\n\n"
+            "Please install: google-auth-oauthlib\n"
+            "Command: pip install google-auth-oauthlib"
+        )
+    
     def refresh_gmail_token(self):
         """Refresh or generate new Gmail OAuth2 token"""
         client_id = self.client_id_input.text().strip()
@@ -314,9 +379,11 @@ class ErikaCredentialsDialog(QDialog):
             )
             return
         
+        if not _GMAIL_SERVICE_AVAILABLE:
+            self._warn_missing_dependencies()
+            return
+        
         try:
-            from erika.plugins.email import ErikaGmailService
-            
             # Use the library's Gmail service for token generation
             gmail_service = ErikaGmailService(
                 user_id="default",
@@ -355,14 +422,6 @@ class ErikaCredentialsDialog(QDialog):
                     "Please check your credentials and try again."
                 )
             
-        except ImportError:
-            QMessageBox.warning(
-                self,
-                "Missing Dependencies",
-                "Google OAuth2 libraries not installed.\n\n"
-                "Please install: google-auth-oauthlib\n"
-                "Command: pip install google-auth-oauthlib"
-            )
         except Exception as e:
             logger.error(f"Token refresh error: {e}")
             QMessageBox.critical(
@@ -397,6 +456,7 @@ class ErikaCredentialsDialog(QDialog):
         )
         
         if success:
+            self._email_config_cache = None
             QMessageBox.information(
                 self, 
                 "✅ Success", 
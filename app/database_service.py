@@ -10,26 +10,77 @@ Version: 1.0.0
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+import base64
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Tuple, Iterator
 from datetime import datetime
 import os
 
+from sqlalchemy import select, func, or_, tuple_
+from sqlalchemy.orm import load_only
+
 # Import from erika library
-from erika.database import db_session, init_db, DATABASE_URL
+from erika.database import db_session, async_db_session, init_db, warm_pool, DATABASE_URL
 from erika.models import ErikaEmailConfig
 
+try:
+    from erika.models import ErikaEmailAnalysis
+except ImportError:
+    # Analysis model is optional; analysis queries log an error and return defaults
+    ErikaEmailAnalysis = None
+
 logger = logging.getLogger(__name__)
 
+_UUID = uuid.UUID
+
+
+def _encode_cursor(received_date: datetime, email_id: Any) -> str:
+    """Encode a (received_date, id) keyset position as an opaque cursor string"""
+    raw = f"{received_date.isoformat()}|{email_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by _encode_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        date_str, id_str = raw.split('|', 1)
+        return datetime.fromisoformat(date_str), _UUID(id_str)
+    except Exception as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+
 
 class ErikaDatabaseService:
     """Database service for Erika's email management data"""
     
-    def __init__(self, database_url: str = None):
+    # Seconds a get_email_stats result is reused before re-querying
+    STATS_CACHE_TTL = 30
+    
+    # Shared across instances: (time.monotonic() when cached, stats dict)
+    _stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+    
+    # Seconds a get_email_config result is reused before re-querying
+    CONFIG_CACHE_TTL = 60
+    
+    # Shared across instances: user_id -> (time.monotonic() when cached, config dict or None)
+    _config_cache: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+    
+    def __init__(self, database_url: str = None, warm_connections: Optional[int] = None):
         """
         Initialize database connection
         
+        Pool size, overflow and recycle time come from the ERIKA_DB_POOL_SIZE,
+        ERIKA_DB_MAX_OVERFLOW and ERIKA_DB_POOL_RECYCLE environment variables.
+        
         Args:
             database_url: PostgreSQL connection string (optional, uses DATABASE_URL env var)
+            warm_connections: Connections to pre-open on first use (default: pool size, 0 to skip)
         """
         if database_url:
             os.environ['DATABASE_URL'] = database_url
@@ -40,80 +91,202 @@ class ErikaDatabaseService:
             logger.info("✅ Database initialized")
         except Exception as e:
             logger.warning(f"⚠️ Database initialization warning: {e}")
+        else:
+            if warm_connections != 0:
+                warm_pool(warm_connections)
         
         self.connected = True
     
+    @staticmethod
+    def _email_stats_statement():
+        """
+        Build the single-scan statistics query
+        
+        GROUPING SETS yields per-category and per-sentiment rows;
+        grouping(category) = 1 marks the sentiment rows.
+        """
+        high_priority_count = func.count(ErikaEmailAnalysis.id).filter(
+            (ErikaEmailAnalysis.is_important == True) |
+            (ErikaEmailAnalysis.requires_response == True)
+        )
+        return select(
+            ErikaEmailAnalysis.category,
+            ErikaEmailAnalysis.sentiment,
+            func.grouping(ErikaEmailAnalysis.category),
+            func.count(ErikaEmailAnalysis.id),
+            high_priority_count
+        ).group_by(
+            func.grouping_sets(ErikaEmailAnalysis.category, ErikaEmailAnalysis.sentiment)
+        )
+    
+    @staticmethod
+    def _email_stats_from_rows(rows) -> Dict[str, Any]:
+        """Fold _email_stats_statement rows into the stats dictionary"""
+        total = 0
+        high_priority = 0
+        by_category = {}
+        by_sentiment = {}
+        for category, sentiment, is_sentiment_row, count, priority_count in rows:
+            if is_sentiment_row:
+                by_sentiment[sentiment] = count
+            else:
+                # Category groups partition all rows, so they sum to the totals
+                by_category[category] = count
+                total += count
+                high_priority += priority_count
+        
+        return {
+            'total': total,
+            'by_category': by_category,
+            'by_sentiment': by_sentiment,
+            'high_priority': high_priority
+        }
+    
+    def _cached_email_stats(self) -> Optional[Dict[str, Any]]:
+        """Get cached stats if still fresh"""
+        cached = ErikaDatabaseService._stats_cache
+        if cached is not None and time.monotonic() - cached[0] < self.STATS_CACHE_TTL:
+            return cached[1]
+        return None
+    
     def get_email_stats(self) -> Dict[str, Any]:
-        """Get email analysis statistics"""
+        """Get email analysis statistics (cached for STATS_CACHE_TTL seconds)"""
+        stats = self._cached_email_stats()
+        if stats is not None:
+            return stats
+        
         try:
-            from erika.models import ErikaEmailAnalysis
-            
             with db_session() as session:
-                # Total emails
-                total = session.query(ErikaEmailAnalysis).count()
-                
-                # By category
-                from sqlalchemy import func
-                category_counts = session.query(
-                    ErikaEmailAnalysis.category,
-                    func.count(ErikaEmailAnalysis.id)
-                ).group_by(ErikaEmailAnalysis.category).all()
-                by_category = {cat: count for cat, count in category_counts}
-                
-                # By sentiment
-                sentiment_counts = session.query(
-                    ErikaEmailAnalysis.sentiment,
-                    func.count(ErikaEmailAnalysis.id)
-                ).group_by(ErikaEmailAnalysis.sentiment).all()
-                by_sentiment = {sent: count for sent, count in sentiment_counts}
-                
-                # High priority
-                high_priority = session.query(ErikaEmailAnalysis).filter(
-                    (ErikaEmailAnalysis.is_important == True) |
-                    (ErikaEmailAnalysis.requires_response == True)
-                ).count()
-                
-                return {
-                    'total': total,
-                    'by_category': by_category,
-                    'by_sentiment': by_sentiment,
-                    'high_priority': high_priority
-                }
+                rows = session.execute(self._email_stats_statement()).all()
+            
+            stats = self._email_stats_from_rows(rows)
+            ErikaDatabaseService._stats_cache = (time.monotonic(), stats)
+            return stats
         except Exception as e:
             logger.error(f"Error getting email stats: {e}")
             return {'total': 0, 'by_category': {}, 'by_sentiment': {}, 'high_priority': 0}
     
+    async def get_email_stats_async(self) -> Dict[str, Any]:
+        """Async version of get_email_stats (shares its cache)"""
+        stats = self._cached_email_stats()
+        if stats is not None:
+            return stats
+        
+        try:
+            async with async_db_session() as session:
+                rows = (await session.execute(self._email_stats_statement())).all()
+            
+            stats = self._email_stats_from_rows(rows)
+            ErikaDatabaseService._stats_cache = (time.monotonic(), stats)
+            return stats
+        except Exception as e:
+            logger.error(f"Error getting email stats: {e}")
+            return {'total': 0, 'by_category': {}, 'by_sentiment': {}, 'high_priority': 0}
+    
+    @staticmethod
+    def _apply_email_filters(query, category_filter: Optional[str] = None,
+                             sentiment_filter: Optional[str] = None,
+                             search_query: Optional[str] = None):
+        """
+        Apply the shared list/count filters to a query
+        
+        Filter values are always bound parameters, so a given filter
+        combination produces the same SQL text on every call.
+        """
+        if category_filter:
+            query = query.filter(ErikaEmailAnalysis.category == category_filter)
+        
+        if sentiment_filter:
+            query = query.filter(ErikaEmailAnalysis.sentiment == sentiment_filter)
+        
+        if search_query:
+            search = f"%{search_query}%"
+            query = query.filter(
+                or_(
+                    ErikaEmailAnalysis.subject.ilike(search),
+                    ErikaEmailAnalysis.sender.ilike(search),
+                    ErikaEmailAnalysis.body.ilike(search)
+                )
+            )
+        
+        return query
+    
+    @staticmethod
+    def _email_list_columns() -> list:
+        """Columns selected for email list views (no TEXT body/content)"""
+        columns = [
+            ErikaEmailAnalysis.id,
+            ErikaEmailAnalysis.subject,
+            ErikaEmailAnalysis.sender,
+            ErikaEmailAnalysis.category,
+            ErikaEmailAnalysis.sentiment,
+            ErikaEmailAnalysis.is_important,
+            ErikaEmailAnalysis.requires_response,
+            ErikaEmailAnalysis.received_date,
+        ]
+        # fraud_score is optional on the model
+        fraud_score = getattr(ErikaEmailAnalysis, 'fraud_score', None)
+        if fraud_score is not None:
+            columns.append(fraud_score)
+        return columns
+    
     def get_recent_emails(self, limit: int = 10, offset: int = 0,
                          category_filter: Optional[str] = None,
                          sentiment_filter: Optional[str] = None,
-                         search_query: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get recent email analyses with optional filtering"""
+                         search_query: Optional[str] = None,
+                         cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get recent email analyses with optional filtering
+        
+        Pagination uses keyset (seek) pagination when ``cursor`` is given:
+        pass the ``cursor`` value of the last email on the previous page to
+        get the next page. ``offset`` is only used when no cursor is given.
+        
+        Args:
+            limit: Maximum number of emails to return
+            offset: Number of emails to skip (ignored if cursor is set)
+            category_filter: Only return emails in this category
+            sentiment_filter: Only return emails with this sentiment
+            search_query: Substring to match in subject, sender or body
+            cursor: Opaque cursor from a previous result row
+            
+        Returns:
+            List of email summary dictionaries (no body; use get_email_by_id),
+            each with a ``cursor`` for the next page
+        """
         try:
-            from erika.models import ErikaEmailAnalysis
-            from sqlalchemy import or_
+            # List view columns only; body/content are fetched by get_email_by_id
+            columns = self._email_list_columns()
             
             with db_session() as session:
-                query = session.query(ErikaEmailAnalysis)
+                query = self._apply_email_filters(
+                    session.query(*columns),
+                    category_filter, sentiment_filter, search_query
+                )
                 
-                if category_filter:
-                    query = query.filter(ErikaEmailAnalysis.category == category_filter)
+                ordering = (
+                    ErikaEmailAnalysis.received_date.desc(),
+                    ErikaEmailAnalysis.id.desc()
+                )
+                query = query.order_by(*ordering)
                 
-                if sentiment_filter:
-                    query = query.filter(ErikaEmailAnalysis.sentiment == sentiment_filter)
-                
-                if search_query:
-                    search = f"%{search_query}%"
-                    query = query.filter(
-                        or_(
-                            ErikaEmailAnalysis.subject.ilike(search),
-                            ErikaEmailAnalysis.sender.ilike(search),
-                            ErikaEmailAnalysis.body.ilike(search)
-                        )
-                    )
-                
-                emails = query.order_by(
-                    ErikaEmailAnalysis.received_date.desc()
-                ).offset(offset).limit(limit).all()
+                if cursor:
+                    # Seek past the last row seen: index range scan, O(limit) at any depth
+                    last_date, last_id = _decode_cursor(cursor)
+                    emails = query.filter(
+                        tuple_(ErikaEmailAnalysis.received_date, ErikaEmailAnalysis.id)
+                        < tuple_(last_date, last_id)
+                    ).limit(limit).all()
+                elif offset:
+                    # Deferred join: skip rows using only ids, then load full rows for this page
+                    id_subq = query.with_entities(
+                        ErikaEmailAnalysis.id
+                    ).offset(offset).limit(limit).subquery()
+                    emails = session.query(*columns).join(
+                        id_subq, ErikaEmailAnalysis.id == id_subq.c.id
+                    ).order_by(*ordering).all()
+                else:
+                    emails = query.limit(limit).all()
                 
                 result = []
                 for email in emails:
@@ -126,8 +299,8 @@ class ErikaDatabaseService:
                         'is_important': email.is_important or False,
                         'requires_response': email.requires_response or False,
                         'malicious_confidence_score': getattr(email, 'fraud_score', 0.0) or 0.0,
-                        'body': email.body or '',
-                        'received_date': email.received_date.isoformat() if email.received_date else None
+                        'received_date': email.received_date.isoformat() if email.received_date else None,
+                        'cursor': _encode_cursor(email.received_date, email.id) if email.received_date else None
                     })
                 return result
         except Exception as e:
@@ -139,58 +312,77 @@ class ErikaDatabaseService:
                        search_query: Optional[str] = None) -> int:
         """Get total email count with optional filtering"""
         try:
-            from erika.models import ErikaEmailAnalysis
-            from sqlalchemy import or_
-            
             with db_session() as session:
-                query = session.query(ErikaEmailAnalysis)
-                
-                if category_filter:
-                    query = query.filter(ErikaEmailAnalysis.category == category_filter)
-                
-                if sentiment_filter:
-                    query = query.filter(ErikaEmailAnalysis.sentiment == sentiment_filter)
-                
-                if search_query:
-                    search = f"%{search_query}%"
-                    query = query.filter(
-                        or_(
-                            ErikaEmailAnalysis.subject.ilike(search),
-                            ErikaEmailAnalysis.sender.ilike(search),
-                            ErikaEmailAnalysis.body.ilike(search)
-                        )
-                    )
-                
-                return query.count()
+                # COUNT(id) directly instead of Query.count()'s SELECT count(*) FROM (SELECT ...)
+                query = self._apply_email_filters(
+                    session.query(func.count(ErikaEmailAnalysis.id)),
+                    category_filter, sentiment_filter, search_query
+                )
+                return query.scalar() or 0
         except Exception as e:
             logger.error(f"Error getting email count: {e}")
             return 0
     
+    @staticmethod
+    def _email_config_to_dict(config: ErikaEmailConfig) -> Dict[str, Any]:
+        """Convert an ErikaEmailConfig row to the service's config dictionary"""
+        return {
+            'id': str(config.id),
+            'gmail_client_id': config.gmail_client_id or '',
+            'gmail_client_secret': config.gmail_client_secret or '',
+            'gmail_enabled': config.gmail_enabled or False,
+            'gmail_check_interval': config.gmail_check_interval or 300,
+            'gmail_keywords': config.gmail_keywords or [],
+            'phishing_detection_enabled': getattr(config, 'phishing_detection_enabled', True),
+            'reverse_image_search_enabled': getattr(config, 'reverse_image_search_enabled', True),
+            'enable_ares_bridge': getattr(config, 'enable_ares_bridge', False),
+            'auto_mitigate_threats': getattr(config, 'auto_mitigate_threats', False),
+            'threat_mitigation_threshold': getattr(config, 'threat_mitigation_threshold', 80),
+            'is_active': config.is_active or True,
+            'last_modified': config.last_modified.isoformat() if config.last_modified else None
+        }
+    
+    def _cached_email_config(self, user_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Get (hit, config) from the config cache"""
+        cached = self._config_cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < self.CONFIG_CACHE_TTL:
+            return True, cached[1]
+        return False, None
+    
     def get_email_config(self, user_id: str = "default") -> Optional[Dict[str, Any]]:
-        """Get email configuration for user"""
+        """Get email configuration for user (cached for CONFIG_CACHE_TTL seconds)"""
+        hit, result = self._cached_email_config(user_id)
+        if hit:
+            return result
+        
         try:
             with db_session() as session:
-                config = session.query(ErikaEmailConfig).filter(
-                    ErikaEmailConfig.user_id == user_id
-                ).first()
-                
-                if config:
-                    return {
-                        'id': str(config.id),
-                        'gmail_client_id': config.gmail_client_id or '',
-                        'gmail_client_secret': config.gmail_client_secret or '',
-                        'gmail_enabled': config.gmail_enabled or False,
-                        'gmail_check_interval': config.gmail_check_interval or 300,
-                        'gmail_keywords': config.gmail_keywords or [],
-                        'phishing_detection_enabled': getattr(config, 'phishing_detection_enabled', True),
-                        'reverse_image_search_enabled': getattr(config, 'reverse_image_search_enabled', True),
-                        'enable_ares_bridge': getattr(config, 'enable_ares_bridge', False),
-                        'auto_mitigate_threats': getattr(config, 'auto_mitigate_threats', False),
-                        'threat_mitigation_threshold': getattr(config, 'threat_mitigation_threshold', 80),
-                        'is_active': config.is_active or True,
-                        'last_modified': config.last_modified.isoformat() if config.last_modified else None
-                    }
-                return None
+                config = session.execute(
+                    select(ErikaEmailConfig).where(ErikaEmailConfig.user_id == user_id)
+                ).scalars().first()
+                result = self._email_config_to_dict(config) if config else None
+            
+            self._config_cache[user_id] = (time.monotonic(), result)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting email config: {e}")
+            return None
+    
+    async def get_email_config_async(self, user_id: str = "default") -> Optional[Dict[str, Any]]:
+        """Async version of get_email_config (shares its cache)"""
+        hit, result = self._cached_email_config(user_id)
+        if hit:
+            return result
+        
+        try:
+            async with async_db_session() as session:
+                config = (await session.execute(
+                    select(ErikaEmailConfig).where(ErikaEmailConfig.user_id == user_id)
+                )).scalars().first()
+                result = self._email_config_to_dict(config) if config else None
+            
+            self._config_cache[user_id] = (time.monotonic(), result)
+            return result
         except Exception as e:
             logger.error(f"Error getting email config: {e}")
             return None
@@ -211,44 +403,45 @@ class ErikaDatabaseService:
                 for key, value in kwargs.items():
                     if hasattr(config, key):
                         setattr(config, key, value)
-                
-                config.last_modified = datetime.utcnow()
-                
-                logger.info(f"✅ Updated email config for user {user_id}")
-                return True
+            
+            self._config_cache.pop(user_id, None)
+            logger.info(f"✅ Updated email config for user {user_id}")
+            return True
         except Exception as e:
             logger.error(f"Error updating email config: {e}")
             return False
     
+    @staticmethod
+    def _email_to_dict(email) -> Dict[str, Any]:
+        """Convert a full ErikaEmailAnalysis row to a dictionary"""
+        return {
+            'id': str(email.id),
+            'subject': email.subject,
+            'sender': email.sender,
+            'recipient': email.recipient,
+            'body': email.body,
+            'content': email.content,
+            'category': email.category,
+            'sentiment': email.sentiment,
+            'is_important': email.is_important,
+            'requires_response': email.requires_response,
+            'priority': email.priority,
+            'harmony_score': email.harmony_score,
+            'nlp_quality_score': email.nlp_quality_score,
+            'received_date': email.received_date.isoformat() if email.received_date else None,
+            'analyzed_at': email.analyzed_at.isoformat() if email.analyzed_at else None
+        }
+    
     def get_email_by_id(self, email_id: str) -> Optional[Dict[str, Any]]:
         """Get email by ID"""
         try:
-            from erika.models import ErikaEmailAnalysis
-            import uuid
-            
             with db_session() as session:
                 email = session.query(ErikaEmailAnalysis).filter(
-                    ErikaEmailAnalysis.id == uuid.UUID(email_id)
+                    ErikaEmailAnalysis.id == _UUID(email_id)
                 ).first()
                 
                 if email:
-                    return {
-                        'id': str(email.id),
-                        'subject': email.subject,
-                        'sender': email.sender,
-                        'recipient': email.recipient,
-                        'body': email.body,
-                        'content': email.content,
-                        'category': email.category,
-                        'sentiment': email.sentiment,
-                        'is_important': email.is_important,
-                        'requires_response': email.requires_response,
-                        'priority': email.priority,
-                        'harmony_score': email.harmony_score,
-                        'nlp_quality_score': email.nlp_quality_score,
-                        'received_date': email.received_date.isoformat() if email.received_date else None,
-                        'analyzed_at': email.analyzed_at.isoformat() if email.analyzed_at else None
-                    }
+                    return self._email_to_dict(email)
                 return None
         except Exception as e:
             logger.error(f"Error getting email by id: {e}")
@@ -257,24 +450,88 @@ class ErikaDatabaseService:
     def update_email(self, email_id: str, **kwargs) -> bool:
         """Update email fields"""
         try:
-            from erika.models import ErikaEmailAnalysis
-            import uuid
-            
             with db_session() as session:
-                email = session.query(ErikaEmailAnalysis).filter(
-                    ErikaEmailAnalysis.id == uuid.UUID(email_id)
+                # Load only the key; assigned columns are written without being read
+                email = session.query(ErikaEmailAnalysis).options(
+                    load_only(ErikaEmailAnalysis.id)
+                ).filter(
+                    ErikaEmailAnalysis.id == _UUID(email_id)
                 ).first()
                 
                 if not email:
                     return False
                 
-                # Update provided fields
+                # Update provided fields (check the class so deferred columns aren't loaded)
                 for key, value in kwargs.items():
-                    if hasattr(email, key):
+                    if hasattr(ErikaEmailAnalysis, key):
                         setattr(email, key, value)
-                
-                return True
+            
+            # Stats may have changed (category, sentiment, priority flags)
+            ErikaDatabaseService._stats_cache = None
+            return True
         except Exception as e:
             logger.error(f"Error updating email: {e}")
             return False
-
+    
+    def bulk_update_emails(self, updates: List[Dict[str, Any]]) -> bool:
+        """
+        Update many emails in one batched UPDATE round-trip
+        
+        Args:
+            updates: List of dicts, each with 'id' plus the fields to change
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not updates:
+            return True
+        
+        try:
+            mappings = []
+            for update in updates:
+                mapping = {
+                    key: value for key, value in update.items()
+                    if key != 'id' and hasattr(ErikaEmailAnalysis, key)
+                }
+                mapping['id'] = _UUID(str(update['id']))
+                mappings.append(mapping)
+            
+            with db_session() as session:
+                session.bulk_update_mappings(ErikaEmailAnalysis, mappings)
+            
+            # Stats may have changed (category, sentiment, priority flags)
+            ErikaDatabaseService._stats_cache = None
+            return True
+        except Exception as e:
+            logger.error(f"Error bulk updating emails: {e}")
+            return False
+    
+    def stream_emails(self, batch: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every email using a server-side cursor
+        
+        Rows are fetched ``batch`` at a time, so memory use stays flat no
+        matter how large the table is. Intended for exports and admin scans.
+        
+        Args:
+            batch: Number of rows fetched per round-trip
+            
+        Yields:
+            Email dictionaries (same shape as get_email_by_id)
+            
+        Raises:
+            Exception: Database errors are re-raised so a failed export is
+                never mistaken for a complete one
+        """
+        try:
+            with db_session() as session:
+                result = session.execute(
+                    select(ErikaEmailAnalysis)
+                    .order_by(ErikaEmailAnalysis.received_date.desc(), ErikaEmailAnalysis.id.desc())
+                    .execution_options(stream_results=True, yield_per=batch)
+                )
+                for email in result.scalars():
+                    yield self._email_to_dict(email)
+        except Exception as e:
+            logger.error(f"Error streaming emails: {e}")
+            raise
@@ -37,6 +37,13 @@ class DesktopIconCreator:
         self.script_path = script_path
         self.system = platform.system()
         
+        # Resolve paths once; every platform method reuses them
+        self._home = Path.home()
+        self._project_abs = str(project_root.resolve())
+        self._icon_abs = str(icon_path.resolve())
+        self._script_abs = str(script_path.resolve())
+        self._python_exe = sys.executable
+        
     def create_desktop_icon(self) -> Tuple[bool, str]:
         """
         Create desktop icon for current platform
@@ -58,26 +65,21 @@ class DesktopIconCreator:
         try:
             messages = []
             
-            # Get absolute paths
-            icon_abs = self.icon_path.resolve()
-            script_abs = self.script_path.resolve()
-            python_exe = sys.executable
-            
-            # Create .desktop file content
+            # Create .desktop file content (shared by both targets)
             desktop_content = f"""[Desktop Entry]
 Version=1.0
 Type=Application
 Name=Erika
 Comment=AI-powered email management system
-Exec={python_exe} {script_abs}
-Icon={icon_abs}
+Exec={self._python_exe} {self._script_abs}
+Icon={self._icon_abs}
 Terminal=false
 Categories=Office;Email;Utility;
 StartupNotify=true
 """
             
             # 1. Create on Desktop
-            desktop_dir = Path.home() / "Desktop"
+            desktop_dir = self._home / "Desktop"
             if not desktop_dir.exists():
                 # Try XDG desktop directory
                 xdg_desktop = os.getenv('XDG_DESKTOP_DIR')
@@ -89,20 +91,18 @@ StartupNotify=true
             
             desktop_file = desktop_dir / "Erika.desktop"
             try:
-                with open(desktop_file, 'w') as f:
-                    f.write(desktop_content)
+                desktop_file.write_text(desktop_content)
                 os.chmod(desktop_file, 0o755)
                 messages.append(f"Desktop: {desktop_file}")
             except Exception as e:
                 messages.append(f"Desktop creation failed: {e}")
             
             # 2. Create in applications directory (for app menu)
-            applications_dir = Path.home() / ".local" / "share" / "applications"
+            applications_dir = self._home / ".local" / "share" / "applications"
             applications_dir.mkdir(parents=True, exist_ok=True)
             app_file = applications_dir / "Erika.desktop"
             try:
-                with open(app_file, 'w') as f:
-                    f.write(desktop_content)
+                app_file.write_text(desktop_content)
                 os.chmod(app_file, 0o755)
                 messages.append(f"Applications: {app_file}")
             except Exception as e:
@@ -123,19 +123,15 @@ StartupNotify=true
             try:
                 import win32com.client
                 
-                desktop = Path.home() / "Desktop"
+                desktop = self._home / "Desktop"
                 shortcut_path = desktop / "Erika.lnk"
                 
-                python_exe = sys.executable
-                script_abs = self.script_path.resolve()
-                icon_abs = self.icon_path.resolve()
-                
                 shell = win32com.client.Dispatch("WScript.Shell")
                 shortcut = shell.CreateShortCut(str(shortcut_path))
-                shortcut.Targetpath = python_exe
-                shortcut.Arguments = f'"{script_abs}"'
-                shortcut.WorkingDirectory = str(self.project_root)
-                shortcut.IconLocation = str(icon_abs)
+                shortcut.Targetpath = self._python_exe
+                shortcut.Arguments = f'"{self._script_abs}"'
+                shortcut.WorkingDirectory = self._project_abs
+                shortcut.IconLocation = self._icon_abs
                 shortcut.save()
                 
                 return True, f"✅ Windows shortcut created: {shortcut_path}"
@@ -150,16 +146,12 @@ StartupNotify=true
     def _create_windows_batch(self) -> Tuple[bool, str]:
         """Create Windows batch file as fallback"""
         try:
-            desktop = Path.home() / "Desktop"
+            desktop = self._home / "Desktop"
             batch_file = desktop / "Erika.bat"
             
-            python_exe = sys.executable
-            script_abs = self.script_path.resolve()
-            project_abs = self.project_root.resolve()
-            
             batch_content = f"""@echo off
-cd /d "{project_abs}"
-"{python_exe}" "{script_abs}"
+cd /d "{self._project_abs}"
+"{self._python_exe}" "{self._script_abs}"
 pause
 """
             
@@ -174,7 +166,7 @@ pause
     def _create_macos_app(self) -> Tuple[bool, str]:
         """Create macOS .app bundle"""
         try:
-            applications_dir = Path.home() / "Applications"
+            applications_dir = self._home / "Applications"
             app_bundle = applications_dir / "Erika.app"
             contents_dir = app_bundle / "Contents"
             macos_dir = contents_dir / "MacOS"
@@ -189,9 +181,6 @@ pause
             shutil.copy(self.icon_path, icon_dest)
             
             # Create Info.plist
-            python_exe = sys.executable
-            script_abs = self.script_path.resolve()
-            
             info_plist = f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
 <plist version="1.0">
@@ -219,8 +208,8 @@ pause
             
             # Create launcher script
             launcher_script = f"""#!/bin/bash
-cd "{self.project_root}"
-"{python_exe}" "{script_abs}"
+cd "{self._project_abs}"
+"{self._python_exe}" "{self._script_abs}"
 """
             
             launcher_path = macos_dir / "Erika"
@@ -244,15 +233,16 @@ cd "{self.project_root}"
         """
         try:
             if self.system == "Linux":
-                desktop_file = Path.home() / "Desktop" / "Erika.desktop"
+                desktop_file = self._home / "Desktop" / "Erika.desktop"
                 if desktop_file.exists():
                     desktop_file.unlink()
                     return True, "✅ Linux desktop icon removed"
                 return False, "Desktop icon not found"
                 
             elif self.system == "Windows":
-                shortcut = Path.home() / "Desktop" / "Erika.lnk"
-                batch = Path.home() / "Desktop" / "Erika.bat"
+                desktop = self._home / "Desktop"
+                shortcut = desktop / "Erika.lnk"
+                batch = desktop / "Erika.bat"
                 removed = []
                 if shortcut.exists():
                     shortcut.unlink()
@@ -265,7 +255,7 @@ cd "{self.project_root}"
                 return False, "Desktop icon not found"
                 
             elif self.system == "Darwin":
-                app_bundle = Path.home() / "Applications" / "Erika.app"
+                app_bundle = self._home / "Applications" / "Erika.app"
                 if app_bundle.exists():
                     shutil.rmtree(app_bundle)
                     return True, "✅ macOS app bundle removed"
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+DNS Cache for Erika
+===================
+
+Process-wide cache for socket.getaddrinfo so repeated gateway requests
+skip the system resolver.
+
+Author: Living Archive team
+Version: 1.0.0
+"""
+
+import socket
+import threading
+import time
+import logging
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+DNS_CACHE_TTL = 900  # 15 minutes
+DNS_CACHE_MAX_ENTRIES = 128
+
+_original_getaddrinfo = socket.getaddrinfo
+_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_lock = threading.Lock()
+_installed = False
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """Drop-in replacement for socket.getaddrinfo with a TTL cache"""
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and now - entry[0] < DNS_CACHE_TTL:
+            return entry[1]
+
+    # Resolve outside the lock; failures are not cached
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+
+    with _lock:
+        if len(_cache) >= DNS_CACHE_MAX_ENTRIES and key not in _cache:
+            # Evict the oldest entry
+            oldest = min(_cache, key=lambda k: _cache[k][0])
+            del _cache[oldest]
+        _cache[key] = (now, result)
+
+    return result
+
+
+def install_dns_cache():
+    """Install the DNS cache (safe to call more than once)"""
+    global _installed
+    if _installed:
+        return
+    socket.getaddrinfo = _cached_getaddrinfo
+    _installed = True
+    logger.debug(f"DNS cache installed (ttl={DNS_CACHE_TTL}s)")
+
+
+def clear_dns_cache():
+    """Forget all cached lookups"""
+    with _lock:
+        _cache.clear()
@@ -9,47 +9,211 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
-import json
 import logging
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Callable
 
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QMessageBox, QGroupBox, QTextEdit, QProgressBar
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QRunnable, QThreadPool, QTimer
 from PyQt6.QtGui import QFont
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from .config_manager import ErikaConfigManager, validate_gateway_url
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so repeated connection tests reuse pooled keep-alive
+# connections instead of paying TCP/TLS setup on every click. Transient
+# gateway errors (e.g. 502 while it restarts) are retried with backoff;
+# urllib3 logs each retry at DEBUG.
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"HEAD", "GET"}),
+    raise_on_status=False
+)
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=_RETRY)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+# Stylesheets (built once at import time)
+_SUBTITLE_QSS = "color: #666; font-size: 12pt;"
+_INSTRUCTIONS_QSS = "color: #555; padding: 10px;"
+
+_STATUS_NEUTRAL_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #f5f5f5;
+    color: #666;
+"""
+
+_STATUS_WARN_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #fff3e0;
+    color: #f57c00;
+"""
+
+_STATUS_OK_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #e8f5e9;
+    color: #2e7d32;
+"""
+
+_STATUS_ERR_QSS = """
+    padding: 10px;
+    border-radius: 4px;
+    background: #ffebee;
+    color: #c62828;
+"""
+
+_SAVE_BTN_QSS = """
+    QPushButton {
+        background: #4CAF50;
+        color: white;
+        padding: 12px 30px;
+        border-radius: 5px;
+        font-weight: bold;
+        font-size: 11pt;
+    }
+    QPushButton:hover {
+        background: #45a049;
+    }
+    QPushButton:disabled {
+        background: #cccccc;
+        color: #666666;
+    }
+"""
+
+# Project root (parent of app directory) and desktop icon inputs
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_ICON_PATH = PROJECT_ROOT / "Images" / "icon.png"
+_SCRIPT_PATH = PROJECT_ROOT / "scripts" / "run_erika.py"
+
+
+def close_session():
+    """Close the shared HTTP session and its pooled connections"""
+    _SESSION.close()
+
+
+@lru_cache(maxsize=8)
+def _get_title_font(size: int) -> QFont:
+    """Bold title font of the given point size, built once per size (needs a running QApplication)"""
+    font = QFont()
+    font.setPointSize(size)
+    font.setBold(True)
+    return font
 
-class ConnectionTestWorker(QThread):
-    """Background worker for testing gateway connection"""
+
+def _probe_health(health_url: str, timeout: float = 5,
+                  cancel: Optional[threading.Event] = None) -> Tuple[bool, str]:
+    """
+    Probe a health endpoint through the shared session
+    
+    Args:
+        health_url: Health endpoint URL
+        timeout: Per-request timeout in seconds
+        cancel: Optional flag; once set, the probe stops before its next request
+        
+    Returns:
+        Tuple of (success: bool, message: str)
+    """
+    try:
+        # Only the status code matters, so skip the body when the server allows it
+        response = _SESSION.head(health_url, timeout=timeout, allow_redirects=True)
+        if cancel is not None and cancel.is_set():
+            # Superseded: release the connection back to the pool and stop
+            response.close()
+            return False, "Cancelled"
+        if response.status_code == 405:
+            response = _SESSION.get(health_url, timeout=timeout, stream=True)
+            response.close()
+        
+        if response.status_code == 200:
+            return True, "✅ Connection successful!"
+        return False, f"❌ Server returned status {response.status_code}"
+    except requests.exceptions.ConnectionError:
+        return False, "❌ Could not connect to server. Check address and port."
+    except requests.exceptions.Timeout:
+        return False, "❌ Connection timeout. Server may be unreachable."
+    except Exception as e:
+        return False, f"❌ Error: {str(e)}"
+
+
+class _ConnectionTestSignals(QObject):
+    """Signals for ConnectionTestRunnable (QRunnable cannot emit itself)"""
     connection_result = pyqtSignal(bool, str)  # success, message
+
+
+class ConnectionTestRunnable(QRunnable):
+    """Pooled background task for testing gateway connection"""
+    
+    # Recent successful results keyed by gateway URL: url -> (timestamp, success, message)
+    CACHE_TTL = 5.0
+    _cache: Dict[str, Tuple[float, bool, str]] = {}
     
-    def __init__(self, gateway_url: str):
+    def __init__(self, gateway_url: str, cancel: threading.Event):
         super().__init__()
         self.gateway_url = gateway_url
+        self.cancel = cancel
+        self.signals = _ConnectionTestSignals()
+    
+    def _emit(self, success: bool, message: str):
+        """Report the result unless a newer test superseded this one"""
+        if not self.cancel.is_set():
+            self.signals.connection_result.emit(success, message)
+    
+    @classmethod
+    def clear_cache(cls):
+        """Forget cached results (e.g. after the address was edited)"""
+        cls._cache.clear()
     
     def run(self):
         """Test connection to gateway"""
-        try:
-            response = requests.get(
-                f"{self.gateway_url}/health",
-                timeout=5
-            )
-            if response.status_code == 200:
-                self.connection_result.emit(True, "✅ Connection successful!")
-            else:
-                self.connection_result.emit(False, f"❌ Server returned status {response.status_code}")
-        except requests.exceptions.ConnectionError:
-            self.connection_result.emit(False, "❌ Could not connect to server. Check address and port.")
-        except requests.exceptions.Timeout:
-            self.connection_result.emit(False, "❌ Connection timeout. Server may be unreachable.")
-        except Exception as e:
-            self.connection_result.emit(False, f"❌ Error: {str(e)}")
+        # Superseded while waiting for a pool thread
+        if self.cancel.is_set():
+            return
+        
+        cached = self._cache.get(self.gateway_url)
+        if cached is not None and time.monotonic() - cached[0] < self.CACHE_TTL:
+            self._emit(cached[1], cached[2])
+            return
+        
+        success, message = _probe_health(f"{self.gateway_url}/health", cancel=self.cancel)
+        if success:
+            self._cache[self.gateway_url] = (time.monotonic(), True, message)
+        self._emit(success, message)
+
+
+class _ConfigSaveSignals(QObject):
+    """Signals for ConfigSaveRunnable"""
+    save_finished = pyqtSignal(bool, str, str)  # success, address, error message
+
+
+class ConfigSaveRunnable(QRunnable):
+    """Pooled background task for saving configuration and creating the desktop icon"""
+    
+    def __init__(self, save: Callable[[str], Tuple[bool, str]], address: str):
+        super().__init__()
+        self.save = save
+        self.address = address
+        self.signals = _ConfigSaveSignals()
+    
+    def run(self):
+        """Run the save and report the outcome"""
+        success, error = self.save(self.address)
+        self.signals.save_finished.emit(success, self.address, error)
 
 
 class ErikaInstallationWizard(QDialog):
@@ -67,8 +231,15 @@ class ErikaInstallationWizard(QDialog):
         self.setWindowTitle("🌿 Erika - Installation Wizard")
         self.setMinimumWidth(700)
         self.setModal(True)
-        self.connection_worker = None
+        self._cancel_flag: Optional[threading.Event] = None
         self.allow_skip = allow_skip
+        
+        # Coalesce per-keystroke address edits into one status reset
+        self._address_debounce = QTimer(self)
+        self._address_debounce.setSingleShot(True)
+        self._address_debounce.setInterval(150)
+        self._address_debounce.timeout.connect(self._apply_address_reset)
+        
         self.setup_ui()
         self.load_existing_config()
     
@@ -80,17 +251,14 @@ class ErikaInstallationWizard(QDialog):
         
         # Welcome title
         title = QLabel("Welcome to Erika! 🌿")
-        title_font = QFont()
-        title_font.setPointSize(20)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(_get_title_font(20))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
         
         # Subtitle
         subtitle = QLabel("Let's set up your connection to the EgoLlama server")
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subtitle.setStyleSheet("color: #666; font-size: 12pt;")
+        subtitle.setStyleSheet(_SUBTITLE_QSS)
         layout.addWidget(subtitle)
         
         layout.addSpacing(20)
@@ -107,7 +275,7 @@ class ErikaInstallationWizard(QDialog):
             "Example: http://egollama.company.com:8082 or http://192.168.1.100:8082"
         )
         instructions.setWordWrap(True)
-        instructions.setStyleSheet("color: #555; padding: 10px;")
+        instructions.setStyleSheet(_INSTRUCTIONS_QSS)
         server_layout.addWidget(instructions)
         
         # Server Address
@@ -124,12 +292,7 @@ class ErikaInstallationWizard(QDialog):
         
         # Connection Status
         self.connection_status = QLabel("Not tested")
-        self.connection_status.setStyleSheet("""
-            padding: 10px;
-            border-radius: 4px;
-            background: #f5f5f5;
-            color: #666;
-        """)
+        self.connection_status.setStyleSheet(_STATUS_NEUTRAL_QSS)
         server_layout.addWidget(self.connection_status)
         
         # Test Connection Button
@@ -162,23 +325,7 @@ class ErikaInstallationWizard(QDialog):
             button_layout.addWidget(self.skip_btn)
         
         self.save_btn = QPushButton("✅ Save & Continue")
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background: #4CAF50;
-                color: white;
-                padding: 12px 30px;
-                border-radius: 5px;
-                font-weight: bold;
-                font-size: 11pt;
-            }
-            QPushButton:hover {
-                background: #45a049;
-            }
-            QPushButton:disabled {
-                background: #cccccc;
-                color: #666666;
-            }
-        """)
+        self.save_btn.setStyleSheet(_SAVE_BTN_QSS)
         self.save_btn.setToolTip("Save configuration and continue")
         self.save_btn.clicked.connect(self.save_configuration)
         self.save_btn.setEnabled(False)  # Disabled until connection tested
@@ -188,17 +335,32 @@ class ErikaInstallationWizard(QDialog):
     
     def on_address_changed(self):
         """Handle address input change"""
+        ConnectionTestRunnable.clear_cache()
+        self._address_debounce.start()
+    
+    def _apply_address_reset(self):
+        """Reset connection status once typing pauses"""
         self.save_btn.setEnabled(False)
         self.connection_status.setText("Not tested")
-        self.connection_status.setStyleSheet("""
-            padding: 10px;
-            border-radius: 4px;
-            background: #f5f5f5;
-            color: #666;
-        """)
+        self.connection_status.setStyleSheet(_STATUS_NEUTRAL_QSS)
+    
+    def _flush_address_reset(self) -> bool:
+        """
+        Apply a pending status reset now instead of after the debounce delay
+        
+        Returns:
+            True if a reset was pending (the address changed since the last test)
+        """
+        if not self._address_debounce.isActive():
+            return False
+        self._address_debounce.stop()
+        self._apply_address_reset()
+        return True
     
     def test_connection(self):
         """Test connection to gateway"""
+        # Otherwise the pending reset would overwrite this test's status
+        self._flush_address_reset()
         address = self.server_address_input.text().strip()
         
         if not address:
@@ -206,11 +368,11 @@ class ErikaInstallationWizard(QDialog):
             return
         
         # Validate URL format
-        if not (address.startswith("http://") or address.startswith("https://")):
+        if validate_gateway_url(address) is None:
             QMessageBox.warning(
                 self, 
                 "Invalid Address",
-                "Server address must start with http:// or https://\n\n"
+                "Server address must start with http:// or https:// followed by a host\n\n"
                 "Example: http://localhost:8082"
             )
             return
@@ -219,20 +381,17 @@ class ErikaInstallationWizard(QDialog):
         self.progress_bar.setVisible(True)
         self.test_btn.setEnabled(False)
         self.connection_status.setText("Testing connection...")
-        self.connection_status.setStyleSheet("""
-            padding: 10px;
-            border-radius: 4px;
-            background: #fff3e0;
-            color: #f57c00;
-        """)
-        
-        # Test in background thread
-        if self.connection_worker and self.connection_worker.isRunning():
-            self.connection_worker.terminate()
-        
-        self.connection_worker = ConnectionTestWorker(address)
-        self.connection_worker.connection_result.connect(self.on_connection_test_result)
-        self.connection_worker.start()
+        self.connection_status.setStyleSheet(_STATUS_WARN_QSS)
+        
+        # Test on a pooled thread; a still-running earlier test is told to
+        # drop its result rather than being killed mid-request
+        if self._cancel_flag is not None:
+            self._cancel_flag.set()
+        self._cancel_flag = threading.Event()
+        
+        runnable = ConnectionTestRunnable(address, cancel=self._cancel_flag)
+        runnable.signals.connection_result.connect(self.on_connection_test_result)
+        QThreadPool.globalInstance().start(runnable)
     
     def on_connection_test_result(self, success: bool, message: str):
         """Handle connection test result"""
@@ -241,21 +400,11 @@ class ErikaInstallationWizard(QDialog):
         
         if success:
             self.connection_status.setText(message)
-            self.connection_status.setStyleSheet("""
-                padding: 10px;
-                border-radius: 4px;
-                background: #e8f5e9;
-                color: #2e7d32;
-            """)
+            self.connection_status.setStyleSheet(_STATUS_OK_QSS)
             self.save_btn.setEnabled(True)
         else:
             self.connection_status.setText(message)
-            self.connection_status.setStyleSheet("""
-                padding: 10px;
-                border-radius: 4px;
-                background: #ffebee;
-                color: #c62828;
-            """)
+            self.connection_status.setStyleSheet(_STATUS_ERR_QSS)
             # Allow saving even if test fails (user might want to configure later)
             # But show a warning
             self.save_btn.setEnabled(True)
@@ -269,18 +418,17 @@ class ErikaInstallationWizard(QDialog):
     
     def load_existing_config(self):
         """Load existing configuration if available"""
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r') as f:
-                    config = json.load(f)
-                    gateway_url = config.get('egollama_gateway_url', '')
-                    if gateway_url:
-                        self.server_address_input.setText(gateway_url)
-            except Exception as e:
-                logger.warning(f"Could not load existing config: {e}")
+        # The config file only (EGOLLAMA_GATEWAY_URL is not offered for saving)
+        config = ErikaConfigManager(self.config_path).get_config()
+        gateway_url = config.get('egollama_gateway_url', '')
+        if gateway_url:
+            self.server_address_input.setText(gateway_url)
     
     def save_configuration(self):
         """Save configuration to file"""
+        # The address was edited since it was tested; it must be retested
+        if self._flush_address_reset():
+            return
         address = self.server_address_input.text().strip()
         
         if not address:
@@ -288,38 +436,46 @@ class ErikaInstallationWizard(QDialog):
             return
         
         # Validate URL format
-        if not (address.startswith("http://") or address.startswith("https://")):
+        if validate_gateway_url(address) is None:
             QMessageBox.warning(
                 self,
                 "Invalid Address",
-                "Server address must start with http:// or https://"
+                "Server address must start with http:// or https:// followed by a host"
             )
             return
         
-        # Ensure config directory exists
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Load existing config or create new
-        config = {}
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r') as f:
-                    config = json.load(f)
-            except Exception:
-                pass
+        # Save on a pooled thread so file I/O and icon creation don't block the UI
+        self.progress_bar.setVisible(True)
+        self.save_btn.setEnabled(False)
         
-        # Update gateway URL
-        config['egollama_gateway_url'] = address
-        config['configured'] = True
+        runnable = ConfigSaveRunnable(self._do_save, address)
+        runnable.signals.save_finished.connect(self.on_save_finished)
+        QThreadPool.globalInstance().start(runnable)
+    
+    def _do_save(self, address: str) -> Tuple[bool, str]:
+        """
+        Write configuration and create the desktop icon (runs off the GUI thread)
         
-        # Save config
+        Returns:
+            Tuple of (success: bool, error message: str)
+        """
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-            
-            # Create desktop icon
-            self.create_desktop_icon()
-            
+            # Fresh manager so the merge starts from the file as it is now;
+            # it keeps other settings and writes atomically
+            ErikaConfigManager(self.config_path).set_gateway_url(address)
+        except Exception as e:
+            return False, str(e)
+        
+        # Create desktop icon
+        self.create_desktop_icon()
+        return True, ""
+    
+    def on_save_finished(self, success: bool, address: str, error: str):
+        """Handle configuration save result"""
+        self.progress_bar.setVisible(False)
+        self.save_btn.setEnabled(True)
+        
+        if success:
             QMessageBox.information(
                 self,
                 "✅ Configuration Saved",
@@ -331,11 +487,11 @@ class ErikaInstallationWizard(QDialog):
             
             self.configuration_saved.emit(address)
             self.accept()
-        except Exception as e:
+        else:
             QMessageBox.critical(
                 self,
                 "❌ Error",
-                f"Failed to save configuration:\n\n{str(e)}"
+                f"Failed to save configuration:\n\n{error}"
             )
     
     def create_desktop_icon(self):
@@ -343,16 +499,14 @@ class ErikaInstallationWizard(QDialog):
         try:
             from app.desktop_icon import DesktopIconCreator
             
-            # Get project root (parent of app directory)
-            project_root = Path(__file__).parent.parent
-            icon_path = project_root / "Images" / "icon.png"
-            script_path = project_root / "scripts" / "run_erika.py"
+            icon_exists = _ICON_PATH.exists()
+            script_exists = _SCRIPT_PATH.exists()
             
-            if icon_path.exists() and script_path.exists():
+            if icon_exists and script_exists:
                 creator = DesktopIconCreator(
-                    project_root=project_root,
-                    icon_path=icon_path,
-                    script_path=script_path
+                    project_root=PROJECT_ROOT,
+                    icon_path=_ICON_PATH,
+                    script_path=_SCRIPT_PATH
                 )
                 success, message = creator.create_desktop_icon()
                 if success:
@@ -360,7 +514,7 @@ class ErikaInstallationWizard(QDialog):
                 else:
                     logger.warning(f"Could not create desktop icon: {message}")
             else:
-                logger.warning(f"Missing files for desktop icon: icon={icon_path.exists()}, script={script_path.exists()}")
+                logger.warning(f"Missing files for desktop icon: icon={icon_exists}, script={script_exists}")
         except Exception as e:
             logger.warning(f"Error creating desktop icon: {e}")
             # Don't fail installation if icon creation fails
@@ -10,33 +10,110 @@ Version: 1.0.0
 """
 
 import sys
+import socket
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urlsplit
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QTextEdit, QMenuBar, QMenu, QStatusBar, QMessageBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
-from PyQt6.QtGui import QFont, QIcon, QAction
+from PyQt6.QtGui import QIcon, QAction
 
 from .config_manager import ErikaConfigManager
-from .settings_dialog import ErikaSettingsDialog
+from .dns_cache import install_dns_cache
 from .database_service import ErikaDatabaseService
-from .credentials_dialog import ErikaCredentialsDialog
+from .installation_wizard import _SESSION, _get_title_font, close_session
 
 logger = logging.getLogger(__name__)
 
+# Stylesheets (built once at import time)
+_SUBTITLE_QSS = "color: #666; font-size: 14pt;"
+
+_PANEL_NEUTRAL_QSS = """
+    padding: 15px;
+    border-radius: 5px;
+    background: #f5f5f5;
+    font-size: 12pt;
+"""
+
+_PANEL_OK_QSS = """
+    padding: 15px;
+    border-radius: 5px;
+    background: #e8f5e9;
+    font-size: 12pt;
+"""
+
+_PANEL_WARN_QSS = """
+    padding: 15px;
+    border-radius: 5px;
+    background: #fff3e0;
+    font-size: 12pt;
+"""
+
+_CONNECT_BTN_QSS = """
+    QPushButton {
+        background: #4285f4;
+        color: white;
+        padding: 15px 30px;
+        border-radius: 5px;
+        font-weight: bold;
+        font-size: 12pt;
+    }
+    QPushButton:hover {
+        background: #357ae8;
+    }
+"""
+
+_SETTINGS_BTN_QSS = """
+    QPushButton {
+        background: #34a853;
+        color: white;
+        padding: 15px 30px;
+        border-radius: 5px;
+        font-weight: bold;
+        font-size: 12pt;
+    }
+    QPushButton:hover {
+        background: #2d8f47;
+    }
+"""
+
+
+def _resolve_gateway_host(gateway_url: str):
+    """
+    Resolve the gateway host (warms the DNS cache)
+    
+    Raises:
+        ValueError: If the URL is malformed (e.g. a non-numeric port)
+        OSError: If the host cannot be resolved
+    """
+    address = urlsplit(gateway_url)
+    default_port = 443 if address.scheme == "https" else 80
+    return socket.getaddrinfo(address.hostname, address.port or default_port)
+
 
 class ErikaStandaloneApp(QMainWindow):
     """Main application window for standalone Erika"""
     
+    # Emitted from worker threads when a startup check finishes: name, result or exception
+    startup_check_finished = pyqtSignal(str, object)
+    
     def __init__(self, embedded_mode: bool = False, parent=None):
         super().__init__(parent)
         self.embedded_mode = embedded_mode
+        
+        # Reuse gateway/database DNS lookups for the life of the process
+        install_dns_cache()
+        
         self.config_manager = ErikaConfigManager()
         self.database_service = None
+        self._settings_dialog = None
         
         self.setWindowTitle("🌿 Erika - AI Email Assistant")
         self.setMinimumSize(1000, 700)
@@ -46,12 +123,60 @@ class ErikaStandaloneApp(QMainWindow):
         self.setup_ui()
         self.setup_status_bar()
         
-        # Initialize database service
+        # Initialize database service and probe the gateway in parallel
+        self.startup_check_finished.connect(self._on_startup_check)
+        self._start_startup_checks()
+    
+    def _start_startup_checks(self):
+        """Run database, gateway and DNS checks concurrently off the GUI thread"""
+        gateway_url = self.config_manager.get_gateway_url()
+        
+        # URL parsing happens on the worker too, so a bad configured URL is
+        # reported as a failed check instead of raising here
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="erika-startup")
+        checks = {
+            'database': executor.submit(ErikaDatabaseService),
+            'gateway': executor.submit(_SESSION.get, f"{gateway_url}/health", timeout=3),
+            'dns': executor.submit(_resolve_gateway_host, gateway_url),
+        }
+        for name, future in checks.items():
+            future.add_done_callback(partial(self._emit_startup_check, name))
+        # Workers finish on their own; results arrive via startup_check_finished
+        executor.shutdown(wait=False)
+    
+    def _emit_startup_check(self, name: str, future: Future):
+        """Forward a finished check to the GUI thread (runs on the worker thread)"""
+        error = future.exception()
         try:
-            self.database_service = ErikaDatabaseService()
-        except Exception as e:
-            logger.warning(f"Could not initialize database service: {e}")
-            self.statusBar().showMessage("⚠️  Database not available", 5000)
+            self.startup_check_finished.emit(name, error if error is not None else future.result())
+        except RuntimeError:
+            # Window was destroyed before the check finished
+            pass
+    
+    def _on_startup_check(self, name: str, result):
+        """Apply a startup check result to the UI"""
+        if name == 'database':
+            if isinstance(result, Exception):
+                logger.warning(f"Could not initialize database service: {result}")
+                self.statusBar().showMessage("⚠️  Database not available", 5000)
+            else:
+                self.database_service = result
+        elif name == 'gateway':
+            if isinstance(result, Exception):
+                logger.warning(f"EgoLlama server not reachable: {result}")
+                self.statusBar().showMessage("⚠️  EgoLlama server not reachable", 5000)
+            else:
+                result.close()
+                if result.status_code != 200:
+                    logger.warning(f"EgoLlama server health check returned {result.status_code}")
+                    self.statusBar().showMessage(
+                        f"⚠️  EgoLlama server returned status {result.status_code}", 5000
+                    )
+        elif name == 'dns' and isinstance(result, ValueError):
+            logger.warning(f"Invalid gateway URL in configuration: {result}")
+            self.statusBar().showMessage("⚠️  Invalid EgoLlama server address", 5000)
+        elif name == 'dns' and isinstance(result, Exception):
+            logger.debug(f"Could not resolve gateway host: {result}")
     
     def setup_menu_bar(self):
         """Setup menu bar"""
@@ -97,17 +222,14 @@ class ErikaStandaloneApp(QMainWindow):
         
         # Welcome title
         title = QLabel("🌿 Welcome to Erika!")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(_get_title_font(24))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
         
         # Subtitle
         subtitle = QLabel("Your AI-Powered Email Assistant")
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subtitle.setStyleSheet("color: #666; font-size: 14pt;")
+        subtitle.setStyleSheet(_SUBTITLE_QSS)
         layout.addWidget(subtitle)
         
         layout.addSpacing(30)
@@ -117,30 +239,20 @@ class ErikaStandaloneApp(QMainWindow):
         
         # Gmail connection status
         self.gmail_status_label = QLabel("Gmail: Not connected")
-        self.gmail_status_label.setStyleSheet("""
-            padding: 15px;
-            border-radius: 5px;
-            background: #f5f5f5;
-            font-size: 12pt;
-        """)
+        self.gmail_status_label.setStyleSheet(_PANEL_NEUTRAL_QSS)
         status_group.addWidget(self.gmail_status_label)
         
         # Server connection status
         gateway_url = self.config_manager.get_gateway_url()
         if gateway_url:
             server_status = f"EgoLlama Server: {gateway_url}"
-            status_color = "#e8f5e9"
+            status_qss = _PANEL_OK_QSS
         else:
             server_status = "EgoLlama Server: Not configured"
-            status_color = "#fff3e0"
+            status_qss = _PANEL_WARN_QSS
         
         self.server_status_label = QLabel(server_status)
-        self.server_status_label.setStyleSheet(f"""
-            padding: 15px;
-            border-radius: 5px;
-            background: {status_color};
-            font-size: 12pt;
-        """)
+        self.server_status_label.setStyleSheet(status_qss)
         status_group.addWidget(self.server_status_label)
         
         layout.addLayout(status_group)
@@ -153,37 +265,13 @@ class ErikaStandaloneApp(QMainWindow):
         
         # Connect Gmail button
         self.connect_btn = QPushButton("📧 Connect Gmail")
-        self.connect_btn.setStyleSheet("""
-            QPushButton {
-                background: #4285f4;
-                color: white;
-                padding: 15px 30px;
-                border-radius: 5px;
-                font-weight: bold;
-                font-size: 12pt;
-            }
-            QPushButton:hover {
-                background: #357ae8;
-            }
-        """)
+        self.connect_btn.setStyleSheet(_CONNECT_BTN_QSS)
         self.connect_btn.clicked.connect(self.connect_gmail)
         button_layout.addWidget(self.connect_btn)
         
         # Settings button
         settings_btn = QPushButton("⚙️ Settings")
-        settings_btn.setStyleSheet("""
-            QPushButton {
-                background: #34a853;
-                color: white;
-                padding: 15px 30px;
-                border-radius: 5px;
-                font-weight: bold;
-                font-size: 12pt;
-            }
-            QPushButton:hover {
-                background: #2d8f47;
-            }
-        """)
+        settings_btn.setStyleSheet(_SETTINGS_BTN_QSS)
         settings_btn.clicked.connect(self.show_settings)
         button_layout.addWidget(settings_btn)
         
@@ -199,15 +287,13 @@ class ErikaStandaloneApp(QMainWindow):
     def connect_gmail(self):
         """Open Gmail connection dialog"""
         try:
+            # Imported on first use to keep it out of application startup
+            from .credentials_dialog import ErikaCredentialsDialog
+            
             dialog = ErikaCredentialsDialog(self)
             if dialog.exec() == dialog.DialogCode.Accepted:
                 self.gmail_status_label.setText("Gmail: Connected ✅")
-                self.gmail_status_label.setStyleSheet("""
-                    padding: 15px;
-                    border-radius: 5px;
-                    background: #e8f5e9;
-                    font-size: 12pt;
-                """)
+                self.gmail_status_label.setStyleSheet(_PANEL_OK_QSS)
                 self.statusBar().showMessage("Gmail connected successfully", 3000)
         except Exception as e:
             logger.error(f"Error connecting Gmail: {e}")
@@ -220,18 +306,22 @@ class ErikaStandaloneApp(QMainWindow):
     def show_settings(self):
         """Show settings dialog"""
         try:
-            dialog = ErikaSettingsDialog(self)
+            # Imported on first use to keep it out of application startup
+            from .settings_dialog import ErikaSettingsDialog
+            
+            # Build the dialog once and refresh it on later opens
+            if self._settings_dialog is None:
+                self._settings_dialog = ErikaSettingsDialog(self)
+            else:
+                self._settings_dialog.load_settings()
+            dialog = self._settings_dialog
+            
             if dialog.exec() == dialog.DialogCode.Accepted:
-                # Update server status if changed
-                gateway_url = self.config_manager.get_gateway_url()
+                # Update server status if changed (the dialog's manager saw the write)
+                gateway_url = dialog.config_manager.get_gateway_url()
                 if gateway_url:
                     self.server_status_label.setText(f"EgoLlama Server: {gateway_url}")
-                    self.server_status_label.setStyleSheet("""
-                        padding: 15px;
-                        border-radius: 5px;
-                        background: #e8f5e9;
-                        font-size: 12pt;
-                    """)
+                    self.server_status_label.setStyleSheet(_PANEL_OK_QSS)
                 self.statusBar().showMessage("Settings saved", 3000)
         except Exception as e:
             logger.error(f"Error showing settings: {e}")
@@ -263,5 +353,6 @@ class ErikaStandaloneApp(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close event"""
+        close_session()
         event.accept()
 
@@ -11,19 +11,83 @@ Version: 1.0.0
 
 import logging
 from pathlib import Path
+from typing import Optional
 
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QMessageBox, QGroupBox, QTabWidget, QWidget
+    QPushButton, QMessageBox, QGroupBox, QTabWidget, QWidget, QCheckBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QUrl
 from PyQt6.QtGui import QFont
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 
-from .config_manager import ErikaConfigManager
-from .installation_wizard import ErikaInstallationWizard
+from .config_manager import ErikaConfigManager, validate_gateway_url
 
 logger = logging.getLogger(__name__)
 
+# Process-wide network manager (keeps keep-alive connections across dialogs)
+_NAM: Optional[QNetworkAccessManager] = None
+
+
+def _network_manager() -> QNetworkAccessManager:
+    """Shared QNetworkAccessManager, created on first use (GUI thread)"""
+    global _NAM
+    if _NAM is None:
+        _NAM = QNetworkAccessManager()
+    return _NAM
+
+
+# Tab indexes (contents are built on first activation)
+_SERVER_TAB = 0
+_SECURITY_TAB = 1
+_DATABASE_TAB = 2
+
+# Dialog stylesheet (installed once on the dialog; widgets are matched by
+# objectName, and the status label's look is picked by its "state" property)
+_DIALOG_QSS = """
+    #erikaInstructions {
+        color: #555;
+        padding: 10px;
+    }
+    #erikaInfo {
+        color: #666;
+        font-size: 9pt;
+        padding: 10px;
+    }
+    #erikaServerStatus {
+        padding: 10px;
+        border-radius: 4px;
+        background: #f5f5f5;
+        color: #666;
+    }
+    #erikaServerStatus[state="ok"] {
+        background: #e8f5e9;
+        color: #2e7d32;
+    }
+    #erikaServerStatus[state="err"] {
+        background: #ffebee;
+        color: #c62828;
+    }
+    #erikaSaveBtn {
+        background: #4CAF50;
+        color: white;
+        padding: 10px 25px;
+        border-radius: 5px;
+        font-weight: bold;
+    }
+    #erikaSaveBtn:hover {
+        background: #45a049;
+    }
+"""
+
+# Security settings shown before/without a stored email config
+_SECURITY_DEFAULTS = {
+    'phishing_detection_enabled': True,
+    'reverse_image_search_enabled': True,
+    'enable_ares_bridge': False,
+    'auto_mitigate_threats': False,
+}
+
 
 class ErikaSettingsDialog(QDialog):
     """Settings dialog for Erika configuration"""
@@ -31,6 +95,9 @@ class ErikaSettingsDialog(QDialog):
     # Signal emitted when settings are saved
     settings_saved = pyqtSignal()
     
+    # Database service shared by all settings dialogs (created on first use)
+    _db_service = None
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.config_manager = ErikaConfigManager()
@@ -38,6 +105,7 @@ class ErikaSettingsDialog(QDialog):
         self.setMinimumWidth(600)
         self.setMinimumHeight(400)
         self.setModal(True)
+        self.setStyleSheet(_DIALOG_QSS)
         self.setup_ui()
         self.load_settings()
     
@@ -55,21 +123,24 @@ class ErikaSettingsDialog(QDialog):
         title.setFont(title_font)
         layout.addWidget(title)
         
-        # Tabs for different settings sections
+        # Tabs for different settings sections (empty until first shown)
         self.tabs = QTabWidget()
+        self._builders = {
+            _SERVER_TAB: self._build_server_tab,
+            _SECURITY_TAB: self._build_security_tab,
+            _DATABASE_TAB: self._build_database_tab,
+        }
         
         # Server Settings Tab
-        server_tab = self.create_server_settings_tab()
-        self.tabs.addTab(server_tab, "🔌 Server")
+        self.tabs.addTab(self.create_server_settings_tab(), "🔌 Server")
         
         # Security Settings Tab
-        security_tab = self.create_security_settings_tab()
-        self.tabs.addTab(security_tab, "🛡️ Security")
+        self.tabs.addTab(self.create_security_settings_tab(), "🛡️ Security")
         
         # Database Settings Tab (optional)
-        database_tab = self.create_database_settings_tab()
-        self.tabs.addTab(database_tab, "💾 Database")
+        self.tabs.addTab(self.create_database_settings_tab(), "💾 Database")
         
+        self.tabs.currentChanged.connect(self._ensure_built)
         layout.addWidget(self.tabs)
         
         # Buttons
@@ -81,37 +152,44 @@ class ErikaSettingsDialog(QDialog):
         button_layout.addWidget(self.cancel_btn)
         
         self.save_btn = QPushButton("💾 Save")
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background: #4CAF50;
-                color: white;
-                padding: 10px 25px;
-                border-radius: 5px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: #45a049;
-            }
-        """)
+        self.save_btn.setObjectName("erikaSaveBtn")
         self.save_btn.clicked.connect(self.save_settings)
         button_layout.addWidget(self.save_btn)
         
         layout.addLayout(button_layout)
     
-    def create_server_settings_tab(self) -> QWidget:
-        """Create server settings tab"""
+    @staticmethod
+    def _create_tab_page() -> QWidget:
+        """Create an empty tab page; its contents are added by a builder"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
         layout.setSpacing(15)
         layout.setContentsMargins(20, 20, 20, 20)
-        
+        return widget
+    
+    def _is_built(self, index: int) -> bool:
+        """Check whether a tab's contents have been created"""
+        return index not in self._builders
+    
+    def _ensure_built(self, index: int):
+        """Build a tab's contents the first time it is shown"""
+        builder = self._builders.pop(index, None)
+        if builder is not None:
+            builder(self.tabs.widget(index).layout())
+    
+    def create_server_settings_tab(self) -> QWidget:
+        """Create server settings tab"""
+        return self._create_tab_page()
+    
+    def _build_server_tab(self, layout: QVBoxLayout):
+        """Build server settings tab contents"""
         # Instructions
         instructions = QLabel(
             "Configure your connection to the EgoLlama Gateway server.\n"
             "This server provides AI-powered email analysis and chat features."
         )
         instructions.setWordWrap(True)
-        instructions.setStyleSheet("color: #555; padding: 10px;")
+        instructions.setObjectName("erikaInstructions")
         layout.addWidget(instructions)
         
         # Server Address
@@ -134,32 +212,26 @@ class ErikaSettingsDialog(QDialog):
         
         # Connection Status
         self.server_status_label = QLabel("Not tested")
-        self.server_status_label.setStyleSheet("""
-            padding: 10px;
-            border-radius: 4px;
-            background: #f5f5f5;
-            color: #666;
-        """)
+        self.server_status_label.setObjectName("erikaServerStatus")
         layout.addWidget(self.server_status_label)
         
         layout.addStretch()
         
-        return widget
+        self.server_address_input.setText(self._gateway_url)
     
     def create_database_settings_tab(self) -> QWidget:
         """Create database settings tab"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        layout.setSpacing(15)
-        layout.setContentsMargins(20, 20, 20, 20)
-        
+        return self._create_tab_page()
+    
+    def _build_database_tab(self, layout: QVBoxLayout):
+        """Build database settings tab contents"""
         # Instructions
         instructions = QLabel(
             "Configure database connection (optional).\n"
             "If not set, Erika will use default PostgreSQL settings."
         )
         instructions.setWordWrap(True)
-        instructions.setStyleSheet("color: #555; padding: 10px;")
+        instructions.setObjectName("erikaInstructions")
         layout.addWidget(instructions)
         
         # Database URL
@@ -174,22 +246,21 @@ class ErikaSettingsDialog(QDialog):
         
         layout.addStretch()
         
-        return widget
+        self.database_url_input.setText(self._database_url)
     
     def create_security_settings_tab(self) -> QWidget:
         """Create security settings tab"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        layout.setSpacing(15)
-        layout.setContentsMargins(20, 20, 20, 20)
-        
+        return self._create_tab_page()
+    
+    def _build_security_tab(self, layout: QVBoxLayout):
+        """Build security settings tab contents"""
         # Instructions
         instructions = QLabel(
             "Configure security features including phishing detection.\n"
             "Reverse image search helps detect phishing emails by verifying profile photos."
         )
         instructions.setWordWrap(True)
-        instructions.setStyleSheet("color: #555; padding: 10px;")
+        instructions.setObjectName("erikaInstructions")
         layout.addWidget(instructions)
         
         # Phishing Detection
@@ -220,7 +291,7 @@ class ErikaSettingsDialog(QDialog):
             "• Internet connection"
         )
         info_label.setWordWrap(True)
-        info_label.setStyleSheet("color: #666; font-size: 9pt; padding: 10px;")
+        info_label.setObjectName("erikaInfo")
         phishing_layout.addWidget(info_label)
         
         layout.addWidget(phishing_group)
@@ -260,49 +331,72 @@ class ErikaSettingsDialog(QDialog):
             "Threat Score >= 0.5: Flag for review"
         )
         ares_info.setWordWrap(True)
-        ares_info.setStyleSheet("color: #666; font-size: 9pt; padding: 10px;")
+        ares_info.setObjectName("erikaInfo")
         ares_layout.addWidget(ares_info)
         
         layout.addWidget(ares_group)
         
         layout.addStretch()
         
-        return widget
+        self._security_checkboxes = {
+            'phishing_detection_enabled': self.phishing_enabled_cb,
+            'reverse_image_search_enabled': self.reverse_search_enabled_cb,
+            'enable_ares_bridge': self.ares_enabled_cb,
+            'auto_mitigate_threats': self.auto_mitigate_cb,
+        }
+        self._show_security_settings()
+    
+    def _show_security_settings(self):
+        """Apply loaded security settings to the checkboxes"""
+        # Programmatic load: keep toggled from firing for every checkbox
+        checkboxes = self._security_checkboxes
+        for checkbox in checkboxes.values():
+            checkbox.blockSignals(True)
+        try:
+            security = self._security
+            for key, checkbox in checkboxes.items():
+                checkbox.setChecked(security[key])
+        finally:
+            for checkbox in checkboxes.values():
+                checkbox.blockSignals(False)
+    
+    @property
+    def db_service(self):
+        """Shared ErikaDatabaseService, created on first access"""
+        cls = type(self)
+        if cls._db_service is None:
+            from app.database_service import ErikaDatabaseService
+            cls._db_service = ErikaDatabaseService()
+        return cls._db_service
     
     def load_settings(self):
         """Load current settings"""
         # Load gateway URL
-        gateway_url = self.config_manager.get_gateway_url()
-        self.server_address_input.setText(gateway_url)
+        self._gateway_url = self.config_manager.get_gateway_url()
         
         # Load database URL
-        database_url = self.config_manager.get_database_url()
-        if database_url:
-            self.database_url_input.setText(database_url)
+        self._database_url = self.config_manager.get_database_url() or ""
         
         # Load security settings from database
+        self._security = dict(_SECURITY_DEFAULTS)
         try:
-            from app.database_service import ErikaDatabaseService
-            db_service = ErikaDatabaseService()
-            config = db_service.get_email_config(user_id="default")
+            config = self.db_service.get_email_config(user_id="default")
             if config:
-                self.phishing_enabled_cb.setChecked(
-                    config.get('phishing_detection_enabled', True)
-                )
-                self.reverse_search_enabled_cb.setChecked(
-                    config.get('reverse_image_search_enabled', True)
-                )
-                self.ares_enabled_cb.setChecked(
-                    config.get('enable_ares_bridge', False)
-                )
-                self.auto_mitigate_cb.setChecked(
-                    config.get('auto_mitigate_threats', False)
-                )
+                get = config.get
+                for key, default in _SECURITY_DEFAULTS.items():
+                    self._security[key] = get(key, default)
         except Exception as e:
-            logger.debug(f"Could not load security settings: {e}")
+            logger.debug("Could not load security settings: %s", e)
             # Use defaults
-            self.phishing_enabled_cb.setChecked(True)
-            self.reverse_search_enabled_cb.setChecked(True)
+        
+        # Refresh tabs that already exist, then build the visible one
+        if self._is_built(_SERVER_TAB):
+            self.server_address_input.setText(self._gateway_url)
+        if self._is_built(_DATABASE_TAB):
+            self.database_url_input.setText(self._database_url)
+        if self._is_built(_SECURITY_TAB):
+            self._show_security_settings()
+        self._ensure_built(self.tabs.currentIndex())
     
     def test_server_connection(self):
         """Test connection to server"""
@@ -312,93 +406,95 @@ class ErikaSettingsDialog(QDialog):
             QMessageBox.warning(self, "Missing Address", "Please enter a server address")
             return
         
-        # Validate URL format
-        if not (address.startswith("http://") or address.startswith("https://")):
+        # Validate URL format (reject malformed hosts before waiting on the network)
+        if validate_gateway_url(address) is None:
             QMessageBox.warning(
                 self,
                 "Invalid Address",
-                "Server address must start with http:// or https://"
+                "Server address must start with http:// or https:// followed by a host\n\n"
+                "Example: http://localhost:8082"
             )
             return
         
-        # Test connection (simple synchronous test)
-        try:
-            import requests
-            response = requests.get(f"{address}/health", timeout=5)
-            if response.status_code == 200:
-                self.server_status_label.setText("✅ Connection successful!")
-                self.server_status_label.setStyleSheet("""
-                    padding: 10px;
-                    border-radius: 4px;
-                    background: #e8f5e9;
-                    color: #2e7d32;
-                """)
-            else:
-                self.server_status_label.setText(f"❌ Server returned status {response.status_code}")
-                self.server_status_label.setStyleSheet("""
-                    padding: 10px;
-                    border-radius: 4px;
-                    background: #ffebee;
-                    color: #c62828;
-                """)
-        except requests.exceptions.ConnectionError:
-            self.server_status_label.setText("❌ Could not connect to server")
-            self.server_status_label.setStyleSheet("""
-                padding: 10px;
-                border-radius: 4px;
-                background: #ffebee;
-                color: #c62828;
-            """)
-        except Exception as e:
-            self.server_status_label.setText(f"❌ Error: {str(e)}")
-            self.server_status_label.setStyleSheet("""
-                padding: 10px;
-                border-radius: 4px;
-                background: #ffebee;
-                color: #c62828;
-            """)
+        # Test connection asynchronously on Qt's event loop
+        request = QNetworkRequest(QUrl(f"{address}/health"))
+        request.setTransferTimeout(5000)
+        
+        self.test_server_btn.setEnabled(False)
+        reply = _network_manager().get(request)
+        reply.finished.connect(lambda: self.on_server_test_finished(reply))
+    
+    def on_server_test_finished(self, reply: QNetworkReply):
+        """Handle server connection test reply"""
+        self.test_server_btn.setEnabled(True)
+        
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        error = reply.error()
+        NetworkError = QNetworkReply.NetworkError
+        if status == 200:
+            self._show_server_status("✅ Connection successful!", True)
+        elif status is not None:
+            self._show_server_status(f"❌ Server returned status {status}", False)
+        elif error == NetworkError.OperationCanceledError:
+            self._show_server_status("❌ Connection timeout", False)
+        elif error in (NetworkError.ConnectionRefusedError, NetworkError.HostNotFoundError,
+                       NetworkError.RemoteHostClosedError):
+            self._show_server_status("❌ Could not connect to server", False)
+        else:
+            self._show_server_status(f"❌ Error: {reply.errorString()}", False)
+        
+        reply.deleteLater()
+    
+    def _show_server_status(self, message: str, success: bool):
+        """Show a connection test result in the server status label"""
+        label = self.server_status_label
+        label.setText(message)
+        # Flip the state property and re-polish against the dialog stylesheet
+        label.setProperty("state", "ok" if success else "err")
+        label.style().unpolish(label)
+        label.style().polish(label)
     
     def save_settings(self):
         """Save settings"""
-        # Save gateway URL
-        gateway_url = self.server_address_input.text().strip()
-        if gateway_url:
-            try:
-                self.config_manager.set_gateway_url(gateway_url)
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    f"Failed to save server settings: {str(e)}"
-                )
-                return
-        
-        # Save database URL
-        database_url = self.database_url_input.text().strip()
-        if database_url:
-            try:
-                self.config_manager.set_database_url(database_url)
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Error",
-                    f"Failed to save database settings: {str(e)}"
-                )
-                return
+        # Gateway and database URLs (tabs never opened keep their loaded values)
+        if self._is_built(_SERVER_TAB):
+            gateway_url = self.server_address_input.text().strip()
+        else:
+            gateway_url = self._gateway_url
+        if self._is_built(_DATABASE_TAB):
+            database_url = self.database_url_input.text().strip()
+        else:
+            database_url = self._database_url
+        
+        # Save both with a single config file write (blank values are left unchanged)
+        try:
+            self.config_manager.update(
+                gateway_url=gateway_url or None,
+                database_url=database_url or None
+            )
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                "Error",
+                f"Failed to save settings: {str(e)}"
+            )
+            return
         
         # Save security settings to database
+        if self._is_built(_SECURITY_TAB):
+            security = {
+                key: checkbox.isChecked()
+                for key, checkbox in self._security_checkboxes.items()
+            }
+        else:
+            security = self._security
+        # Write only the flags that changed since load_settings
+        delta = {key: value for key, value in security.items() if self._security.get(key) != value}
         try:
-            from app.database_service import ErikaDatabaseService
-            db_service = ErikaDatabaseService()
-            db_service.update_email_config(
-                user_id="default",
-                phishing_detection_enabled=self.phishing_enabled_cb.isChecked(),
-                reverse_image_search_enabled=self.reverse_search_enabled_cb.isChecked(),
-                enable_ares_bridge=self.ares_enabled_cb.isChecked(),
-                auto_mitigate_threats=self.auto_mitigate_cb.isChecked()
-            )
+            if delta and self.db_service.update_email_config(user_id="default", **delta):
+                self._security = security
         except Exception as e:
-            logger.warning(f"Could not save security settings: {e}")
+            logger.warning("Could not save security settings: %s", e)
             # Continue - not critical
         
         QMessageBox.information(
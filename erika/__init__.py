@@ -9,23 +9,42 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
-# Core exports
-from .plugins.email import (
-    ErikaGmailService,
-    OAuthTokenManager,
-    EmailPlugin,
-    get_gmail_service_for_user,
-)
-
-from .models import ErikaEmailConfig
-
-from .api import (
-    get_email_config,
-    update_email_config,
-    test_gmail_connection,
-)
-
-from .services import ErikaEgoLlamaGateway
+import importlib
+
+# Core exports are imported on first attribute access (PEP 562), so
+# "import erika" doesn't pull in google-auth, SQLAlchemy, requests, etc.
+_LAZY = {
+    # Gmail Service
+    'ErikaGmailService': '.plugins.email',
+    'OAuthTokenManager': '.plugins.email',
+    'EmailPlugin': '.plugins.email',
+    'get_gmail_service_for_user': '.plugins.email',
+    
+    # Models
+    'ErikaEmailConfig': '.models',
+    
+    # API
+    'get_email_config': '.api',
+    'update_email_config': '.api',
+    'test_gmail_connection': '.api',
+    
+    # EgoLlama Gateway
+    'ErikaEgoLlamaGateway': '.services',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 __all__ = [
     # Gmail Service
@@ -9,17 +9,74 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
+import functools
 import logging
+import re
 from typing import Dict, Any, Optional
-from datetime import datetime, timezone as dt_timezone
+
+from sqlalchemy import select, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from ..models import ErikaEmailConfig
 from ..plugins.email.gmail_service import ErikaGmailService, GmailValidationError, GmailAuthenticationError
-from ..database import db_session
+from ..database import scoped_db_session
 
 logger = logging.getLogger(__name__)
 
 
+def api_endpoint(error_message: str):
+    """
+    Wrap an API function in the standard response envelope
+    
+    The wrapped function returns a plain dict; 'status': 'success' is added
+    unless it sets its own status. Any exception is logged and returned as
+    {'status': 'error', 'error': str(e)}.
+    
+    Args:
+        error_message: Log message prefix used when the function raises
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return {'status': 'success', **(fn(*args, **kwargs) or {})}
+            except Exception as e:
+                logger.exception("%s: %s", error_message, e)
+                return {
+                    'status': 'error',
+                    'error': str(e)
+                }
+        return wrapper
+    return decorator
+
+
+# Shape of a Google OAuth client ID (checked before any network round-trip)
+_GCID_RE = re.compile(r'^[\w\-]+\.apps\.googleusercontent\.com\Z')
+
+# Columns returned by get_email_config (secrets are reduced to a flag in SQL)
+_CONFIG_VIEW_QUERY = select(
+    ErikaEmailConfig.gmail_enabled,
+    ErikaEmailConfig.gmail_check_interval,
+    ErikaEmailConfig.gmail_keywords,
+    ErikaEmailConfig.is_active,
+    ErikaEmailConfig.last_modified,
+    ErikaEmailConfig.created_at,
+    and_(
+        ErikaEmailConfig.gmail_client_id.isnot(None),
+        ErikaEmailConfig.gmail_client_id != ''
+    ).label('has_credentials'),
+)
+
+# Columns needed to authenticate against Gmail
+_CONFIG_AUTH_QUERY = select(
+    ErikaEmailConfig.gmail_enabled,
+    ErikaEmailConfig.gmail_client_id,
+    ErikaEmailConfig.gmail_client_secret,
+    ErikaEmailConfig.gmail_keywords,
+)
+
+
+@api_endpoint("Error getting email config")
 def get_email_config(user_id: str) -> Dict[str, Any]:
     """
     Get user's email configuration
@@ -30,42 +87,36 @@ def get_email_config(user_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with status and config data
     """
-    try:
-        with db_session() as session:
-            # Get or create email config
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == user_id
-            ).first()
-            
-            if not config:
-                config = ErikaEmailConfig(user_id=user_id)
-                session.add(config)
-                session.commit()
-            
-            # Return config without exposing secrets
-            config_data = {
-                'gmail_enabled': config.gmail_enabled,
-                'gmail_check_interval': config.gmail_check_interval,
-                'gmail_keywords': config.gmail_keywords or [],
-                'is_active': config.is_active,
-                'last_modified': config.last_modified.isoformat() if config.last_modified else None,
-                'created_at': config.created_at.isoformat() if config.created_at else None,
-                'has_credentials': bool(config.gmail_client_id)  # Don't expose client_secret
-            }
-            
-            return {
-                'status': 'success',
-                'config': config_data
-            }
+    query = _CONFIG_VIEW_QUERY.where(ErikaEmailConfig.user_id == user_id)
+    with scoped_db_session() as session:
+        # Get or create email config
+        config = session.execute(query).first()
         
-    except Exception as e:
-        logger.error(f"Error getting email config: {e}")
-        return {
-            'status': 'error',
-            'error': str(e)
+        if not config:
+            # Race-safe create: a concurrent request may insert the same user
+            session.execute(
+                pg_insert(ErikaEmailConfig)
+                .values(user_id=user_id)
+                .on_conflict_do_nothing(index_elements=['user_id'])
+            )
+            session.commit()
+            config = session.execute(query).first()
+    
+    # Return config without exposing secrets
+    return {
+        'config': {
+            'gmail_enabled': config.gmail_enabled,
+            'gmail_check_interval': config.gmail_check_interval,
+            'gmail_keywords': config.gmail_keywords or [],
+            'is_active': config.is_active,
+            'last_modified': config.last_modified.isoformat() if config.last_modified else None,
+            'created_at': config.created_at.isoformat() if config.created_at else None,
+            'has_credentials': bool(config.has_credentials)  # Don't expose client_secret
         }
+    }
 
 
+@api_endpoint("Error updating email config")
 def update_email_config(user_id: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update user's email configuration
@@ -77,64 +128,62 @@ def update_email_config(user_id: str, request_data: Dict[str, Any]) -> Dict[str,
     Returns:
         Dictionary with status and message
     """
-    try:
-        with db_session() as session:
-            # Get or create email config
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == user_id
-            ).first()
-            
-            if not config:
-                config = ErikaEmailConfig(user_id=user_id)
-                session.add(config)
-            
-            # Update config fields (with validation)
-            if 'gmail_enabled' in request_data:
-                if isinstance(request_data['gmail_enabled'], bool):
-                    config.gmail_enabled = request_data['gmail_enabled']
-            
-            if 'gmail_check_interval' in request_data:
-                interval = request_data['gmail_check_interval']
-                if isinstance(interval, int) and 60 <= interval <= 86400:  # 1 minute to 24 hours
-                    config.gmail_check_interval = interval
-            
-            if 'gmail_keywords' in request_data:
-                keywords = request_data['gmail_keywords']
-                if isinstance(keywords, list):
-                    # Validate and sanitize keywords
-                    sanitized_keywords = []
-                    for kw in keywords[:20]:  # Limit to 20 keywords
-                        if isinstance(kw, str) and len(kw.strip()) <= 100:
-                            sanitized_keywords.append(kw.strip())
-                    config.gmail_keywords = sanitized_keywords
-            
-            # OAuth credentials (should be set securely, not via API in production)
-            if 'gmail_client_id' in request_data:
-                client_id = request_data['gmail_client_id']
-                if isinstance(client_id, str) and len(client_id) <= 500:
-                    config.gmail_client_id = client_id
-            
-            if 'gmail_client_secret' in request_data:
-                client_secret = request_data['gmail_client_secret']
-                if isinstance(client_secret, str) and len(client_secret) <= 500:
-                    config.gmail_client_secret = client_secret
-            
-            config.last_modified = datetime.now(dt_timezone.utc)
-            
-            return {
-                'status': 'success',
-                'message': 'Email configuration updated successfully',
-                'config_id': str(config.id)
-            }
-        
-    except Exception as e:
-        logger.error(f"Error updating email config: {e}")
-        return {
-            'status': 'error',
-            'error': str(e)
-        }
+    # Collect validated fields
+    values = {}
+    
+    if 'gmail_enabled' in request_data:
+        if isinstance(request_data['gmail_enabled'], bool):
+            values['gmail_enabled'] = request_data['gmail_enabled']
+    
+    if 'gmail_check_interval' in request_data:
+        interval = request_data['gmail_check_interval']
+        if isinstance(interval, int) and 60 <= interval <= 86400:  # 1 minute to 24 hours
+            values['gmail_check_interval'] = interval
+    
+    if 'gmail_keywords' in request_data:
+        keywords = request_data['gmail_keywords']
+        if isinstance(keywords, list):
+            # Normalize (strip, lowercase), dedupe and sort in one pass;
+            # Gmail search is case-insensitive, and a stable order keeps
+            # the stored JSON identical for the same keyword set
+            values['gmail_keywords'] = sorted({
+                kw.strip().lower()
+                for kw in keywords[:20]  # Limit to 20 keywords
+                if isinstance(kw, str) and 0 < len(kw.strip()) <= 100
+            })
+    
+    # OAuth credentials (should be set securely, not via API in production)
+    if 'gmail_client_id' in request_data:
+        client_id = request_data['gmail_client_id']
+        if isinstance(client_id, str) and len(client_id) <= 500:
+            values['gmail_client_id'] = client_id
+    
+    if 'gmail_client_secret' in request_data:
+        client_secret = request_data['gmail_client_secret']
+        if isinstance(client_secret, str) and len(client_secret) <= 500:
+            values['gmail_client_secret'] = client_secret
+    
+    # Create or update in a single INSERT ... ON CONFLICT DO UPDATE
+    # (set_ bypasses Column.onupdate, so last_modified is bumped explicitly)
+    stmt = (
+        pg_insert(ErikaEmailConfig)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={**values, 'last_modified': func.now()}
+        )
+        .returning(ErikaEmailConfig.id)
+    )
+    with scoped_db_session() as session:
+        config_id = session.execute(stmt).scalar_one()
+    
+    return {
+        'message': 'Email configuration updated successfully',
+        'config_id': str(config_id)
+    }
 
 
+@api_endpoint("Error testing Gmail connection")
 def test_gmail_connection(user_id: str) -> Dict[str, Any]:
     """
     Test Gmail connection with current credentials
@@ -145,65 +194,64 @@ def test_gmail_connection(user_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with status and connection result
     """
-    try:
-        with db_session() as session:
-            # Get email config
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == user_id
-            ).first()
-            
-            if not config or not config.gmail_enabled:
-                return {
-                    'status': 'error',
-                    'error': 'Gmail not configured for user'
-                }
-            
-            if not config.gmail_client_id or not config.gmail_client_secret:
-                return {
-                    'status': 'error',
-                    'error': 'Gmail OAuth credentials not configured'
-                }
+    with scoped_db_session() as session:
+        # Get email config
+        config = session.execute(
+            _CONFIG_AUTH_QUERY.where(ErikaEmailConfig.user_id == user_id)
+        ).first()
+        
+        if not config or not config.gmail_enabled:
+            return {
+                'status': 'error',
+                'error': 'Gmail not configured for user'
+            }
         
-        # Initialize Gmail service
-        gmail_service = ErikaGmailService(
-            user_id=user_id,
-            config={
-                'gmail_client_id': config.gmail_client_id,
-                'gmail_client_secret': config.gmail_client_secret,
-                'gmail_keywords': config.gmail_keywords or []
+        if not config.gmail_client_id or not config.gmail_client_secret:
+            return {
+                'status': 'error',
+                'error': 'Gmail OAuth credentials not configured'
             }
+    
+    # Reject obviously malformed credentials without an OAuth handshake
+    if (not _GCID_RE.match(config.gmail_client_id)
+            or not 10 <= len(config.gmail_client_secret) <= 500):
+        return {
+            'status': 'error',
+            'error': 'Malformed OAuth credentials',
+            'authenticated': False
+        }
+    
+    # Initialize Gmail service
+    gmail_service = ErikaGmailService(
+        user_id=user_id,
+        config={
+            'gmail_client_id': config.gmail_client_id,
+            'gmail_client_secret': config.gmail_client_secret,
+            'gmail_keywords': config.gmail_keywords or []
+        }
+    )
+    
+    # Test authentication
+    try:
+        authenticated = gmail_service.authenticate(
+            client_id=config.gmail_client_id,
+            client_secret=config.gmail_client_secret
         )
         
-        # Test authentication
-        try:
-            authenticated = gmail_service.authenticate(
-                client_id=config.gmail_client_id,
-                client_secret=config.gmail_client_secret
-            )
-            
-            if authenticated:
-                return {
-                    'status': 'success',
-                    'message': 'Gmail connection successful',
-                    'authenticated': True
-                }
-            else:
-                return {
-                    'status': 'error',
-                    'error': 'Gmail authentication failed',
-                    'authenticated': False
-                }
-        except GmailAuthenticationError as e:
+        if authenticated:
+            return {
+                'message': 'Gmail connection successful',
+                'authenticated': True
+            }
+        else:
             return {
                 'status': 'error',
-                'error': str(e),
+                'error': 'Gmail authentication failed',
                 'authenticated': False
             }
-        
-    except Exception as e:
-        logger.error(f"Error testing Gmail connection: {e}")
+    except GmailAuthenticationError as e:
         return {
             'status': 'error',
-            'error': str(e)
+            'error': str(e),
+            'authenticated': False
         }
-
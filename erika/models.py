@@ -10,11 +10,10 @@ Version: 1.0.0
 """
 
 from sqlalchemy import (
-    Column, String, Integer, Boolean, Text, DateTime, JSON,
-    Index, UniqueConstraint
+    Column, String, Integer, Boolean, Text, DateTime,
+    Index, UniqueConstraint, func
 )
-from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime, timezone as dt_timezone
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 from typing import Optional
 
@@ -37,7 +36,7 @@ class ErikaEmailConfig(Base):
     gmail_client_secret = Column(Text, nullable=True)  # OAuth2 client secret (encrypted in production)
     gmail_enabled = Column(Boolean, default=False)
     gmail_check_interval = Column(Integer, default=300)  # Check interval in seconds
-    gmail_keywords = Column(JSON, default=list)  # Keywords for email filtering
+    gmail_keywords = Column(JSONB, default=list, server_default='[]', nullable=False)  # Keywords for email filtering
     
     # Security Features
     phishing_detection_enabled = Column(Boolean, default=True)  # Enable reverse image search phishing detection
@@ -48,13 +47,24 @@ class ErikaEmailConfig(Base):
     
     # Status
     is_active = Column(Boolean, default=True)
-    last_modified = Column(DateTime(timezone=True), default=lambda: datetime.now(dt_timezone.utc))
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(dt_timezone.utc))
+    last_modified = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     def __repr__(self):
         return f"<ErikaEmailConfig(user_id='{self.user_id}', gmail_enabled={self.gmail_enabled})>"
     
     __table_args__ = (
-        Index('idx_user_id', 'user_id'),
+        # user_id's unique index already serves lookups; this covering index
+        # lets the settings read path be answered index-only (PostgreSQL 11+)
+        Index(
+            'ix_email_cfg_cover', 'user_id',
+            postgresql_include=[
+                'gmail_enabled', 'gmail_check_interval', 'is_active',
+                'phishing_detection_enabled', 'reverse_image_search_enabled',
+                'enable_ares_bridge', 'auto_mitigate_threats',
+            ]
+        ),
+        # Keyword containment lookups (gmail_keywords ? :kw)
+        Index('ix_email_cfg_keywords_gin', 'gmail_keywords', postgresql_using='gin'),
     )
 
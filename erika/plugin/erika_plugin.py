@@ -10,6 +10,7 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
+import asyncio
 import logging
 from typing import Optional
 from fastapi import FastAPI
@@ -55,7 +56,10 @@ class ErikaPlugin:
     
     def unregister_from_gateway(self) -> bool:
         """Unregister plugin from gateway"""
-        return self.client.unregister_plugin()
+        try:
+            return self.client.unregister_plugin()
+        finally:
+            self.client.close()
     
     def create_standalone_app(self) -> FastAPI:
         """
@@ -74,9 +78,28 @@ class ErikaPlugin:
                 version="1.0.0"
             )
             self._app.include_router(self.router)
+            
+            # Gateway keep-alive runs as a task on the app's event loop
+            @self._app.on_event("startup")
+            async def _start_keep_alive():
+                self._app.state.keep_alive = asyncio.create_task(self.client.keep_alive_async())
+            
+            @self._app.on_event("shutdown")
+            async def _stop_keep_alive():
+                task = self._app.state.keep_alive
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                await self.shutdown()
         
         return self._app
     
+    async def shutdown(self):
+        """Release the plugin client's pooled gateway connections"""
+        await self.client.aclose()
+    
     def is_registered(self) -> bool:
         """Check if plugin is registered with gateway"""
         return self.client.registered
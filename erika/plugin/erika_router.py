@@ -6,17 +6,30 @@ Erika FastAPI Router
 FastAPI router for Erika email assistant endpoints.
 This router is registered with EgoLlama Gateway as a plugin.
 
+Handlers that do blocking work (SQLAlchemy sessions, Gmail API calls,
+requests-based gateway calls) are plain ``def`` so Starlette runs them in
+its threadpool. Only handlers that never block, that await real async
+I/O, or that push their blocking calls onto that threadpool themselves
+(as /emails does for Gmail fetches) are ``async def``; a blocking call
+inside one of those must be offloaded so it does not stall the event loop.
+
 Author: Living Archive team
 Version: 1.0.0
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from collections import namedtuple
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+import orjson
 from fastapi import APIRouter, HTTPException, Body, Depends
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import select, func, bindparam
 
 # Import Erika services
 from ..plugins.email.gmail_service import ErikaGmailService, GmailAuthenticationError
@@ -30,6 +43,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter(
     prefix="/api/erika",
     tags=["Erika Email Assistant"],
+    default_response_class=ORJSONResponse,
     responses={
         404: {"description": "Not found"},
         500: {"description": "Internal server error"}
@@ -37,6 +51,170 @@ router = APIRouter(
 )
 
 
+def _json_response(payload: Dict[str, Any]) -> Response:
+    """Serialize a payload once with orjson, bypassing FastAPI's response encoding"""
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+# ============================================================================
+# EMAIL CONFIG CACHE
+# ============================================================================
+
+# Config fields the endpoints need (detached from the session)
+_EmailConfig = namedtuple('_EmailConfig', [
+    'gmail_client_id', 'gmail_client_secret', 'gmail_enabled',
+    'user_id', 'gmail_check_interval', 'gmail_keywords'
+])
+
+# Column order matches _EmailConfig; SQLAlchemy caches the compiled statement
+_CONFIG_SELECT = select(
+    ErikaEmailConfig.gmail_client_id,
+    ErikaEmailConfig.gmail_client_secret,
+    ErikaEmailConfig.gmail_enabled,
+    ErikaEmailConfig.user_id,
+    ErikaEmailConfig.gmail_check_interval,
+    ErikaEmailConfig.gmail_keywords,
+).where(ErikaEmailConfig.user_id == bindparam("uid"))
+
+# /stats counters as scalar subqueries of a single SELECT
+_STATS_SELECT = select(
+    select(func.count()).select_from(ErikaEmailAnalysis).scalar_subquery(),
+    select(func.count()).select_from(ErikaEmailConfig).where(
+        ErikaEmailConfig.gmail_enabled == True
+    ).scalar_subquery(),
+)
+
+CONFIG_CACHE_TTL = 30.0  # seconds
+CONFIG_CACHE_MAX_ENTRIES = 64
+
+_config_cache: Dict[str, Tuple[float, _EmailConfig]] = {}
+_config_cache_lock = threading.Lock()
+
+
+def _load_config(user_id: str) -> Optional[_EmailConfig]:
+    """
+    Load a user's email config, cached for CONFIG_CACHE_TTL seconds
+    
+    Args:
+        user_id: User identifier
+        
+    Returns:
+        _EmailConfig, or None if the user has no config
+    """
+    now = time.monotonic()
+    entry = _config_cache.get(user_id)
+    if entry is not None and now - entry[0] < CONFIG_CACHE_TTL:
+        return entry[1]
+    
+    with db_session() as session:
+        row = session.execute(_CONFIG_SELECT, {"uid": user_id}).first()
+    if row is None:
+        return None
+    result = _EmailConfig._make(row)
+    
+    with _config_cache_lock:
+        if len(_config_cache) >= CONFIG_CACHE_MAX_ENTRIES and user_id not in _config_cache:
+            # Evict the oldest entry
+            oldest = min(_config_cache, key=lambda k: _config_cache[k][0])
+            del _config_cache[oldest]
+        _config_cache[user_id] = (now, result)
+    
+    return result
+
+
+def _invalidate_config(user_id: str):
+    """Drop a user's cached email config after it changes"""
+    with _config_cache_lock:
+        _config_cache.pop(user_id, None)
+
+
+GMAIL_CREDENTIALS_CACHE_MAX_ENTRIES = 32
+
+# (user_id, client_id, client_secret) -> loaded OAuth2 credentials
+_gmail_credentials: Dict[Tuple[str, str, str], Any] = {}
+# Serializes token loading, refresh and the OAuth flow
+_gmail_auth_lock = threading.Lock()
+
+
+def _gmail_service_for(user_id: str, client_id: str, client_secret: str) -> ErikaGmailService:
+    """
+    Build a Gmail service for one request from cached credentials
+    
+    The API client sits on an httplib2 connection, which is not
+    thread-safe, so each request gets its own; only the credentials are
+    shared, and loading or refreshing them happens under a lock.
+    
+    Raises:
+        GmailAuthenticationError: If credentials cannot be loaded
+    """
+    service = ErikaGmailService(
+        user_id=user_id,
+        config={
+            'gmail_client_id': client_id,
+            'gmail_client_secret': client_secret
+        }
+    )
+    key = (user_id, client_id, client_secret)
+    with _gmail_auth_lock:
+        creds = _gmail_credentials.get(key)
+        if creds is None or not creds.valid:
+            creds = service.load_credentials()
+            if len(_gmail_credentials) >= GMAIL_CREDENTIALS_CACHE_MAX_ENTRIES and key not in _gmail_credentials:
+                _gmail_credentials.clear()
+            _gmail_credentials[key] = creds
+    service.use_credentials(creds)
+    return service
+
+
+def _forget_gmail_credentials():
+    """Drop cached Gmail credentials after a user's credentials change"""
+    with _gmail_auth_lock:
+        _gmail_credentials.clear()
+
+
+def _get_gmail_service(config: _EmailConfig) -> ErikaGmailService:
+    """
+    Get an authenticated Gmail service for a config
+    
+    Token loading happens once per credential set (until the token
+    expires) rather than once per request.
+    """
+    return _gmail_service_for(config.user_id, config.gmail_client_id, config.gmail_client_secret)
+
+
+async def _stream_email_list(emails: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode an email list response incrementally, one email at a time"""
+    yield b'{"success":true,"emails":['
+    count = 0
+    async for email in emails:
+        yield (b',' if count else b'') + orjson.dumps(email)
+        count += 1
+    yield b'],"count":' + str(count).encode() + b'}'
+
+
+def get_gmail_ctx() -> Tuple[_EmailConfig, ErikaGmailService]:
+    """
+    FastAPI dependency resolving the default user's config and Gmail service
+    
+    Raises:
+        HTTPException: 400 if Gmail is not configured, 401 if authentication fails
+    """
+    config = _load_config("default")
+    if not config or not config.gmail_enabled:
+        raise HTTPException(
+            status_code=400,
+            detail="Gmail not configured. Please connect Gmail first."
+        )
+    try:
+        return config, _get_gmail_service(config)
+    except GmailAuthenticationError as e:
+        logger.error(f"Gmail authentication error: {e}")
+        raise HTTPException(
+            status_code=401,
+            detail=f"Gmail authentication failed: {str(e)}"
+        )
+
+
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
@@ -62,22 +240,36 @@ class GmailConnectRequest(BaseModel):
 # EMAIL ENDPOINTS
 # ============================================================================
 
-@router.get("/health")
+_HEALTH = {
+    "status": "healthy",
+    "plugin": "erika",
+    "version": "1.0.0"
+}
+
+# (second, encoded body) of the last health response; the timestamp has
+# one-second resolution, so the body is re-encoded at most once per second
+_health_body: Tuple[int, bytes] = (0, b"")
+
+
+@router.get("/health", response_class=ORJSONResponse, response_model=None)
 async def health_check():
     """Health check endpoint for Erika plugin"""
-    return JSONResponse(content={
-        "status": "healthy",
-        "plugin": "erika",
-        "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    global _health_body
+    now = int(time.time())
+    if _health_body[0] != now:
+        _health_body = (now, orjson.dumps({
+            **_HEALTH,
+            "timestamp": datetime.utcfromtimestamp(now).isoformat()
+        }))
+    return Response(content=_health_body[1], media_type="application/json")
 
 
-@router.get("/emails")
+@router.get("/emails", response_class=ORJSONResponse, response_model=None)
 async def get_emails(
     max_results: int = 50,
     days_back: int = 7,
-    keywords: Optional[str] = None
+    keywords: Optional[str] = None,
+    ctx: Tuple[_EmailConfig, ErikaGmailService] = Depends(get_gmail_ctx)
 ):
     """
     Get user's emails from Gmail
@@ -91,55 +283,24 @@ async def get_emails(
         List of email dictionaries
     """
     try:
-        # Parse keywords if provided
-        keyword_list = [k.strip() for k in keywords.split(',')] if keywords else None
+        # Parse keywords if provided (blank entries such as "a,,b" are dropped)
+        keyword_list = [k.strip() for k in keywords.split(',') if k.strip()] if keywords else None
+        
+        config, gmail_service = ctx
+        
+        # Search before the response starts, so failures still map to 401/500
+        # (keyword filtering is done by Gmail's search)
+        messages = await run_in_threadpool(
+            gmail_service.search_unread, max_results, days_back, keyword_list
+        )
+        emails = gmail_service.iter_email_details(messages)
+        
+        # Stream each email as it is fetched (off the event loop) and encoded
+        return StreamingResponse(
+            _stream_email_list(iterate_in_threadpool(emails)),
+            media_type="application/json"
+        )
         
-        # Get email config from database
-        with db_session() as session:
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == "default"
-            ).first()
-            
-            if not config or not config.gmail_enabled:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Gmail not configured. Please connect Gmail first."
-                )
-            
-            # Initialize Gmail service
-            gmail_service = ErikaGmailService(
-                client_id=config.gmail_client_id,
-                client_secret=config.gmail_client_secret,
-                user_id=config.user_id
-            )
-            
-            # Fetch emails
-            emails = gmail_service.get_unread_emails(
-                max_results=max_results,
-                days_back=days_back
-            )
-            
-            # Filter by keywords if provided
-            if keyword_list:
-                filtered_emails = []
-                for email in emails:
-                    subject = email.get('subject', '').lower()
-                    sender = email.get('sender', '').lower()
-                    body = email.get('body', '').lower()
-                    
-                    if any(keyword.lower() in subject or 
-                           keyword.lower() in sender or 
-                           keyword.lower() in body 
-                           for keyword in keyword_list):
-                        filtered_emails.append(email)
-                emails = filtered_emails
-            
-            return JSONResponse(content={
-                "success": True,
-                "emails": emails,
-                "count": len(emails)
-            })
-            
     except GmailAuthenticationError as e:
         logger.error(f"Gmail authentication error: {e}")
         raise HTTPException(
@@ -155,34 +316,22 @@ async def get_emails(
 
 
 @router.get("/emails/{email_id}")
-async def get_email_details(email_id: str):
+def get_email_details(
+    email_id: str,
+    ctx: Tuple[_EmailConfig, ErikaGmailService] = Depends(get_gmail_ctx)
+):
     """Get detailed information about a specific email"""
     try:
-        with db_session() as session:
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == "default"
-            ).first()
-            
-            if not config or not config.gmail_enabled:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Gmail not configured"
-                )
-            
-            gmail_service = ErikaGmailService(
-                client_id=config.gmail_client_id,
-                client_secret=config.gmail_client_secret,
-                user_id=config.user_id
-            )
-            
-            # Get email details (this would need to be implemented in gmail_service)
-            # For now, return a placeholder
-            return JSONResponse(content={
-                "success": True,
-                "email_id": email_id,
-                "message": "Email details endpoint - implementation needed"
-            })
-            
+        config, gmail_service = ctx
+        
+        # Get email details (this would need to be implemented in gmail_service)
+        # For now, return a placeholder
+        return ORJSONResponse(content={
+            "success": True,
+            "email_id": email_id,
+            "message": "Email details endpoint - implementation needed"
+        })
+        
     except Exception as e:
         logger.error(f"Error getting email details: {e}")
         raise HTTPException(
@@ -192,7 +341,10 @@ async def get_email_details(email_id: str):
 
 
 @router.post("/emails/analyze")
-async def analyze_email(request: EmailAnalyzeRequest):
+def analyze_email(
+    request: EmailAnalyzeRequest,
+    ctx: Tuple[_EmailConfig, ErikaGmailService] = Depends(get_gmail_ctx)
+):
     """
     Analyze an email with AI
     
@@ -204,41 +356,26 @@ async def analyze_email(request: EmailAnalyzeRequest):
     """
     try:
         # Get email from Gmail
-        with db_session() as session:
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == "default"
-            ).first()
-            
-            if not config or not config.gmail_enabled:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Gmail not configured"
-                )
-            
-            gmail_service = ErikaGmailService(
-                client_id=config.gmail_client_id,
-                client_secret=config.gmail_client_secret,
-                user_id=config.user_id
-            )
-            
-            # Get email details
-            # TODO: Implement get_email_by_id in gmail_service
-            # email = gmail_service.get_email_by_id(request.email_id)
-            
-            # Analyze with EgoLlama Gateway
-            gateway = ErikaEgoLlamaGateway()
-            if gateway.is_available():
-                # Sync email to gateway for analysis
-                # analysis = gateway.analyze_email(email_data)
-                pass
-            
-            return JSONResponse(content={
-                "success": True,
-                "email_id": request.email_id,
-                "analysis_type": request.analysis_type,
-                "message": "Email analysis endpoint - full implementation needed"
-            })
-            
+        config, gmail_service = ctx
+        
+        # Get email details
+        # TODO: Implement get_email_by_id in gmail_service
+        # email = gmail_service.get_email_by_id(request.email_id)
+        
+        # Analyze with EgoLlama Gateway
+        gateway = ErikaEgoLlamaGateway()
+        if gateway.is_available():
+            # Sync email to gateway for analysis
+            # analysis = gateway.analyze_email(email_data)
+            pass
+        
+        return ORJSONResponse(content={
+            "success": True,
+            "email_id": request.email_id,
+            "analysis_type": request.analysis_type,
+            "message": "Email analysis endpoint - full implementation needed"
+        })
+        
     except Exception as e:
         logger.error(f"Error analyzing email: {e}")
         raise HTTPException(
@@ -252,7 +389,7 @@ async def analyze_email(request: EmailAnalyzeRequest):
 # ============================================================================
 
 @router.post("/gmail/connect")
-async def connect_gmail(request: GmailConnectRequest):
+def connect_gmail(request: GmailConnectRequest):
     """
     Connect Gmail account via OAuth
     
@@ -279,19 +416,24 @@ async def connect_gmail(request: GmailConnectRequest):
             config.gmail_enabled = True
             
             session.commit()
+            _invalidate_config(request.user_id)
+            # Credentials changed: drop tokens loaded with the old ones
+            _forget_gmail_credentials()
             
             # Test connection
             gmail_service = ErikaGmailService(
-                client_id=request.client_id,
-                client_secret=request.client_secret,
-                user_id=request.user_id
+                user_id=request.user_id,
+                config={
+                    'gmail_client_id': request.client_id,
+                    'gmail_client_secret': request.client_secret
+                }
             )
             
             # Validate credentials (this will trigger OAuth flow if needed)
             try:
                 gmail_service.validate_credentials()
             except GmailAuthenticationError as e:
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=400,
                     content={
                         "success": False,
@@ -300,7 +442,7 @@ async def connect_gmail(request: GmailConnectRequest):
                     }
                 )
             
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "success": True,
                 "message": "Gmail connected successfully",
                 "user_id": request.user_id
@@ -314,30 +456,27 @@ async def connect_gmail(request: GmailConnectRequest):
         )
 
 
-@router.get("/gmail/status")
-async def get_gmail_status():
+@router.get("/gmail/status", response_class=ORJSONResponse, response_model=None)
+def get_gmail_status():
     """Get Gmail connection status"""
     try:
-        with db_session() as session:
-            config = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.user_id == "default"
-            ).first()
-            
-            if not config:
-                return JSONResponse(content={
-                    "success": True,
-                    "connected": False,
-                    "message": "Gmail not configured"
-                })
-            
-            return JSONResponse(content={
+        config = _load_config("default")
+        
+        if not config:
+            return _json_response({
                 "success": True,
-                "connected": config.gmail_enabled,
-                "user_id": config.user_id,
-                "check_interval": config.gmail_check_interval,
-                "keywords": config.gmail_keywords or []
+                "connected": False,
+                "message": "Gmail not configured"
             })
-            
+        
+        return _json_response({
+            "success": True,
+            "connected": config.gmail_enabled,
+            "user_id": config.user_id,
+            "check_interval": config.gmail_check_interval,
+            "keywords": config.gmail_keywords or []
+        })
+        
     except Exception as e:
         logger.error(f"Error getting Gmail status: {e}")
         raise HTTPException(
@@ -347,7 +486,7 @@ async def get_gmail_status():
 
 
 @router.post("/gmail/disconnect")
-async def disconnect_gmail():
+def disconnect_gmail():
     """Disconnect Gmail account"""
     try:
         with db_session() as session:
@@ -358,8 +497,10 @@ async def disconnect_gmail():
             if config:
                 config.gmail_enabled = False
                 session.commit()
+                _invalidate_config("default")
+                _forget_gmail_credentials()
             
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "success": True,
                 "message": "Gmail disconnected"
             })
@@ -376,20 +517,15 @@ async def disconnect_gmail():
 # STATISTICS ENDPOINTS
 # ============================================================================
 
-@router.get("/stats")
-async def get_stats():
+@router.get("/stats", response_class=ORJSONResponse, response_model=None)
+def get_stats():
     """Get Erika statistics"""
     try:
         with db_session() as session:
-            # Count emails analyzed
-            email_count = session.query(ErikaEmailAnalysis).count()
-            
-            # Count active configs
-            config_count = session.query(ErikaEmailConfig).filter(
-                ErikaEmailConfig.gmail_enabled == True
-            ).count()
+            # Emails analyzed and active configs in one round-trip
+            email_count, config_count = session.execute(_STATS_SELECT).one()
             
-            return JSONResponse(content={
+            return _json_response({
                 "success": True,
                 "stats": {
                     "emails_analyzed": email_count,
@@ -10,15 +10,36 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
+import asyncio
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 from typing import Optional, Dict, Any
 from pathlib import Path
-import json
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# httpx is optional; only the *_async methods need it
+try:
+    import httpx
+    _HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    _HTTPX_AVAILABLE = False
+
+# HTTP/2 (multiplexed gateway calls over one connection) needs httpx[http2]
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 
 class PluginConnectionError(Exception):
     """Exception for plugin connection errors"""
@@ -47,6 +68,67 @@ class ErikaPluginClient:
         self.registered = False
         self.plugin_name = "erika"
         self.plugin_version = "1.0.0"
+        self._client = None  # httpx.AsyncClient, created on first async call
+        
+        # The registration payload is static; encode it once
+        self._registration_body = orjson.dumps(self._registration_data())
+        
+        # Pooled session for the sync calls (keep-alive across keep_alive ticks)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+    
+    def _registration_data(self) -> Dict[str, Any]:
+        """Build the plugin registration payload"""
+        # Get plugin URL (if running as standalone server)
+        # For now, Erika registers metadata only
+        # The router will be included if Erika is installed locally in EgoLlama
+        plugin_url = None  # Can be set if Erika runs its own server
+        
+        return {
+            "plugin_name": self.plugin_name,
+            "version": self.plugin_version,
+            "description": "Erika Email Assistant - AI-powered email management and analysis",
+            "author": "Living Archive team",
+            "endpoints": [
+                "/api/erika/health",
+                "/api/erika/emails",
+                "/api/erika/emails/{email_id}",
+                "/api/erika/emails/analyze",
+                "/api/erika/gmail/connect",
+                "/api/erika/gmail/status",
+                "/api/erika/gmail/disconnect",
+                "/api/erika/stats"
+            ],
+            "plugin_url": plugin_url,
+            "metadata": {
+                "type": "email_assistant",
+                "capabilities": [
+                    "email_reading",
+                    "email_analysis",
+                    "phishing_detection",
+                    "gmail_oauth"
+                ]
+            }
+        }
+    
+    def _handle_registration_response(self, status_code: int, result: Optional[Dict[str, Any]], text: str) -> bool:
+        """Log a registration response and update registration state"""
+        if status_code == 200:
+            result = result or {}
+            logger.info(f"✅ Erika plugin registered with EgoLlama Gateway")
+            logger.info(f"   Plugin: {result.get('plugin', {}).get('name', 'erika')}")
+            logger.info(f"   Endpoints: {len(result.get('plugin', {}).get('endpoints', []))}")
+            self.registered = True
+            return True
+        logger.error(f"❌ Plugin registration failed: {status_code}")
+        logger.error(f"   Response: {text}")
+        return False
         
     def check_gateway_health(self) -> bool:
         """
@@ -56,7 +138,7 @@ class ErikaPluginClient:
             True if gateway is reachable
         """
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self.egollama_url}/health",
                 timeout=5
             )
@@ -78,57 +160,16 @@ class ErikaPluginClient:
                 logger.warning(f"⚠️  EgoLlama Gateway not available at {self.egollama_url}")
                 return False
             
-            # Get plugin URL (if running as standalone server)
-            # For now, Erika registers metadata only
-            # The router will be included if Erika is installed locally in EgoLlama
-            plugin_url = None  # Can be set if Erika runs its own server
-            
-            # Prepare registration data
-            registration_data = {
-                "plugin_name": self.plugin_name,
-                "version": self.plugin_version,
-                "description": "Erika Email Assistant - AI-powered email management and analysis",
-                "author": "Living Archive team",
-                "endpoints": [
-                    "/api/erika/health",
-                    "/api/erika/emails",
-                    "/api/erika/emails/{email_id}",
-                    "/api/erika/emails/analyze",
-                    "/api/erika/gmail/connect",
-                    "/api/erika/gmail/status",
-                    "/api/erika/gmail/disconnect",
-                    "/api/erika/stats"
-                ],
-                "plugin_url": plugin_url,
-                "metadata": {
-                    "type": "email_assistant",
-                    "capabilities": [
-                        "email_reading",
-                        "email_analysis",
-                        "phishing_detection",
-                        "gmail_oauth"
-                    ]
-                }
-            }
-            
             # Register plugin
-            response = requests.post(
+            response = self._session.post(
                 f"{self.egollama_url}/api/plugins/register",
-                json=registration_data,
+                data=self._registration_body,
+                headers=_JSON_HEADERS,
                 timeout=10
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"✅ Erika plugin registered with EgoLlama Gateway")
-                logger.info(f"   Plugin: {result.get('plugin', {}).get('name', 'erika')}")
-                logger.info(f"   Endpoints: {len(result.get('plugin', {}).get('endpoints', []))}")
-                self.registered = True
-                return True
-            else:
-                logger.error(f"❌ Plugin registration failed: {response.status_code}")
-                logger.error(f"   Response: {response.text}")
-                return False
+            result = response.json() if response.status_code == 200 else None
+            return self._handle_registration_response(response.status_code, result, response.text)
                 
         except requests.exceptions.ConnectionError:
             logger.error(f"❌ Cannot connect to EgoLlama Gateway at {self.egollama_url}")
@@ -141,7 +182,7 @@ class ErikaPluginClient:
     def unregister_plugin(self) -> bool:
         """Unregister plugin from gateway"""
         try:
-            response = requests.delete(
+            response = self._session.delete(
                 f"{self.egollama_url}/api/plugins/{self.plugin_name}",
                 timeout=10
             )
@@ -158,7 +199,7 @@ class ErikaPluginClient:
     def get_plugin_info(self) -> Optional[Dict[str, Any]]:
         """Get plugin information from gateway"""
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self.egollama_url}/api/plugins/{self.plugin_name}",
                 timeout=5
             )
@@ -170,6 +211,143 @@ class ErikaPluginClient:
             logger.debug(f"Error getting plugin info: {e}")
             return None
     
+    def close(self):
+        """Close the pooled sync session"""
+        self._session.close()
+    
+    # ------------------------------------------------------------------
+    # Async API (pooled httpx client, for use inside an event loop)
+    # ------------------------------------------------------------------
+    
+    def _get_async_client(self) -> "httpx.AsyncClient":
+        """Shared httpx.AsyncClient, created on first use"""
+        if self._client is None:
+            if not _HTTPX_AVAILABLE:
+                raise PluginConnectionError("httpx is required for async gateway calls")
+            self._client = httpx.AsyncClient(
+                base_url=self.egollama_url,
+                http2=_HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(5.0, connect=2.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=4,
+                    max_connections=20,
+                    keepalive_expiry=120  # outlive the 60s keep-alive interval
+                )
+            )
+        return self._client
+    
+    async def check_gateway_health_async(self) -> bool:
+        """Async variant of check_gateway_health"""
+        try:
+            response = await self._get_async_client().get("/health")
+            return response.status_code == 200
+        except Exception as e:
+            logger.debug(f"Gateway health check failed: {e}")
+            return False
+    
+    async def register_plugin_async(self) -> bool:
+        """Async variant of register_plugin"""
+        try:
+            # Check gateway health first
+            if not await self.check_gateway_health_async():
+                logger.warning(f"⚠️  EgoLlama Gateway not available at {self.egollama_url}")
+                return False
+            
+            response = await self._get_async_client().post(
+                "/api/plugins/register",
+                content=self._registration_body,
+                headers=_JSON_HEADERS,
+                timeout=10.0
+            )
+            
+            result = response.json() if response.status_code == 200 else None
+            return self._handle_registration_response(response.status_code, result, response.text)
+            
+        except httpx.ConnectError:
+            logger.error(f"❌ Cannot connect to EgoLlama Gateway at {self.egollama_url}")
+            logger.error("   Make sure EgoLlama Gateway is running")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Error registering plugin: {e}", exc_info=True)
+            return False
+    
+    async def unregister_plugin_async(self) -> bool:
+        """Async variant of unregister_plugin"""
+        try:
+            response = await self._get_async_client().delete(
+                f"/api/plugins/{self.plugin_name}",
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                logger.info("✅ Erika plugin unregistered")
+                self.registered = False
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error unregistering plugin: {e}")
+            return False
+    
+    async def get_plugin_info_async(self) -> Optional[Dict[str, Any]]:
+        """Async variant of get_plugin_info"""
+        try:
+            response = await self._get_async_client().get(f"/api/plugins/{self.plugin_name}")
+            
+            if response.status_code == 200:
+                return response.json().get('plugin')
+            return None
+        except Exception as e:
+            logger.debug(f"Error getting plugin info: {e}")
+            return None
+    
+    async def aclose(self):
+        """Close the pooled async client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def keep_alive_async(self, interval: int = 60):
+        """
+        Async keep-alive loop; each tick checks health and registration together
+        
+        Args:
+            interval: Check interval in seconds (default: 60)
+        """
+        logger.info(f"🔄 Starting async keep-alive loop (interval: {interval}s)")
+        
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._keep_alive_tick_async()
+            except Exception as e:
+                logger.error(f"Error in keep-alive loop: {e}")
+                await asyncio.sleep(interval)  # Wait before retrying
+    
+    async def _keep_alive_tick_async(self):
+        """Run one keep-alive check (health and plugin info fetched concurrently)"""
+        client = self._get_async_client()
+        health, info = await asyncio.gather(
+            client.get("/health"),
+            client.get(f"/api/plugins/{self.plugin_name}"),
+            return_exceptions=True
+        )
+        
+        if isinstance(health, Exception) or health.status_code != 200:
+            logger.warning("⚠️  Gateway connection lost, attempting reconnection...")
+            self.registered = False
+            # Try to re-register
+            if await self.register_plugin_async():
+                logger.info("✅ Reconnected to gateway")
+            else:
+                logger.warning("⚠️  Reconnection failed, will retry...")
+        elif not self.registered:
+            logger.info("🔄 Gateway available, re-registering plugin...")
+            await self.register_plugin_async()
+        elif (isinstance(info, Exception) or info.status_code != 200
+                or not info.json().get('plugin')):
+            logger.warning("⚠️  Plugin not found in gateway, re-registering...")
+            await self.register_plugin_async()
+    
     def keep_alive(self, interval: int = 60):
         """
         Keep plugin connection alive by periodically checking gateway
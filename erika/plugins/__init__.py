@@ -9,7 +9,8 @@ Author: Living Archive team
 Version: 1.0.0
 """
 
-from typing import Dict, Type, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Type, Optional
 import logging
 from .base import ErikaPlugin
 
@@ -19,7 +20,10 @@ logger = logging.getLogger(__name__)
 class PluginRegistry:
     """Central plugin registry for Erika"""
     
+    # Copy-on-write: register() swaps in a new dict, so readers can share a
+    # read-only view without copying
     _plugins: Dict[str, ErikaPlugin] = {}
+    _plugins_view: Mapping[str, ErikaPlugin] = MappingProxyType(_plugins)
     _plugin_classes: Dict[str, Type[ErikaPlugin]] = {}
     _initialized: bool = False
     
@@ -42,7 +46,10 @@ class PluginRegistry:
                 logger.warning(f"Plugin '{plugin_name}' already registered, overwriting")
             
             cls._plugin_classes[plugin_name] = plugin_class
-            cls._plugins[plugin_name] = instance
+            plugins = dict(cls._plugins)
+            plugins[plugin_name] = instance
+            cls._plugins = plugins
+            cls._plugins_view = MappingProxyType(plugins)
             
             logger.info(f"✅ Registered plugin: {plugin_name} v{instance.version}")
             return instance
@@ -65,14 +72,14 @@ class PluginRegistry:
         return cls._plugins.get(name)
     
     @classmethod
-    def get_all(cls) -> Dict[str, ErikaPlugin]:
+    def get_all(cls) -> Mapping[str, ErikaPlugin]:
         """
         Get all registered plugins
         
         Returns:
-            Dict[str, ErikaPlugin]: Dictionary of all plugins
+            Mapping[str, ErikaPlugin]: Read-only view of all plugins
         """
-        return cls._plugins.copy()
+        return cls._plugins_view
     
     @classmethod
     def initialize_all(cls) -> bool:
@@ -10,11 +10,28 @@ Version: 1.0.0
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 import logging
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Per-instance cache of get_email_details results
+EMAIL_DETAILS_CACHE_TTL = 60.0  # seconds
+EMAIL_DETAILS_CACHE_MAX_ENTRIES = 256
+
+# Email address format, matched as two halves split at the '@' so the
+# engine never backtracks across it (\Z rather than $ rejects a trailing
+# newline). Together they accept exactly local@domain.tld.
+_EMAIL_LOCAL_RE = re.compile(r'[a-zA-Z0-9._%+-]+\Z')
+_EMAIL_DOMAIN_RE = re.compile(r'[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
 
 class EmailServiceError(Exception):
     """Base exception for email service errors"""
@@ -49,6 +66,12 @@ class BaseEmailService(ABC):
         self.user_id = user_id or "default"
         self.config = config or {}
         self._authenticated = False
+        # email_id -> (fetched_at, email), least recently used first
+        self._details_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._details_cache_lock = threading.Lock()
+        # Serializes use of the provider connection when the async wrappers
+        # run calls on this instance from several executor threads
+        self._connection_lock = threading.RLock()
     
     @abstractmethod
     def authenticate(self, **kwargs) -> bool:
@@ -112,6 +135,42 @@ class BaseEmailService(ABC):
         """
         pass
     
+    async def _run_in_executor(self, func, *args, **kwargs):
+        """Run a blocking provider call in the event loop's default executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
+    async def aget_unread_emails(
+        self,
+        max_results: int = 50,
+        days_back: int = 7
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of get_unread_emails
+        
+        Lets callers overlap several accounts, e.g.
+        await asyncio.gather(*(svc.aget_unread_emails() for svc in services))
+        """
+        return await self._run_in_executor(
+            self.get_unread_emails, max_results=max_results, days_back=days_back
+        )
+    
+    async def asend_email(
+        self,
+        to: str,
+        subject: str,
+        body: str,
+        thread_id: Optional[str] = None
+    ) -> bool:
+        """Async variant of send_email"""
+        return await self._run_in_executor(
+            self.send_email, to, subject, body, thread_id=thread_id
+        )
+    
+    async def aget_email_details(self, email_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_email_details"""
+        return await self._run_in_executor(self.get_email_details, email_id)
+    
     def get_email_details(self, email_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information for a specific email
@@ -121,14 +180,131 @@ class BaseEmailService(ABC):
             
         Returns:
             Email dictionary with full details, or None if not found
+            
+        Found emails are cached for EMAIL_DETAILS_CACHE_TTL seconds (LRU,
+        EMAIL_DETAILS_CACHE_MAX_ENTRIES per service instance).
+        """
+        now = time.monotonic()
+        email = self._cached_email_details(email_id, now)
+        if email is not None:
+            return email
+        
+        email = self._lookup_email(email_id)
+        if email is not None:
+            self._cache_email_details(email_id, email, now)
+        return email
+    
+    def _cached_email_details(self, email_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached email and mark it recently used, or None"""
+        with self._details_cache_lock:
+            entry = self._details_cache.get(email_id)
+            if entry is None or now - entry[0] >= EMAIL_DETAILS_CACHE_TTL:
+                return None
+            self._details_cache.move_to_end(email_id)
+            return entry[1]
+    
+    def _cache_email_details(self, email_id: str, email: Dict[str, Any], fetched_at: float):
+        """Store an email in the details cache, evicting the least recently used"""
+        with self._details_cache_lock:
+            cache = self._details_cache
+            cache[email_id] = (fetched_at, email)
+            cache.move_to_end(email_id)
+            if len(cache) > EMAIL_DETAILS_CACHE_MAX_ENTRIES:
+                cache.popitem(last=False)
+    
+    def get_emails_by_ids(self, email_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get detailed information for several emails
+        
+        The default looks each ID up with get_email_details; providers that
+        can fetch many messages in one round trip override this.
+        
+        Args:
+            email_ids: Email IDs (provider-specific)
+            
+        Returns:
+            Dictionary of email ID -> email dictionary (missing IDs omitted)
         """
-        # Default implementation: get from unread emails
+        emails = {}
+        for email_id in email_ids:
+            email = self.get_email_details(email_id)
+            if email is not None:
+                emails[email_id] = email
+        return emails
+    
+    def _lookup_email(self, email_id: str) -> Optional[Dict[str, Any]]:
+        """Find an email by ID, directly if the provider supports it"""
+        try:
+            return self._fetch_email_by_id(email_id)
+        except NotImplementedError:
+            pass
+        
+        # Fallback for providers without a direct lookup: scan unread emails
         emails = self.get_unread_emails(max_results=1000, days_back=30)
         for email in emails:
             if email.get('id') == email_id:
                 return email
         return None
     
+    def clear_email_details_cache(self):
+        """Forget cached email details (call after sending or re-authenticating)"""
+        with self._details_cache_lock:
+            self._details_cache.clear()
+    
+    def _fetch_email_by_id(self, email_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single email directly by ID
+        
+        Providers that can look a message up by ID override this; the default
+        raises NotImplementedError so get_email_details falls back to a scan.
+        
+        Args:
+            email_id: Email ID (provider-specific)
+            
+        Returns:
+            Email dictionary, or None if not found
+        """
+        raise NotImplementedError
+    
+    def _get_connection(self) -> Any:
+        """
+        Return a live provider connection, (re)connecting if needed
+        
+        Providers that hold a session (e.g. an IMAP socket) override this
+        to reuse it across calls; the default has nothing to hold.
+        """
+        return None
+    
+    def _release_connection(self, conn: Any, error: Optional[BaseException] = None):
+        """
+        Hand a connection back after use
+        
+        Args:
+            conn: Connection returned by _get_connection
+            error: Exception raised while it was in use, if any; providers
+                drop the connection when it indicates a broken session
+        """
+        pass
+    
+    @contextmanager
+    def use_connection(self) -> Iterator[Any]:
+        """
+        Borrow the provider connection for the duration of a with block
+        
+        Usage:
+            with self.use_connection() as conn:
+                conn.select('INBOX')
+        """
+        with self._connection_lock:
+            conn = self._get_connection()
+            try:
+                yield conn
+            except BaseException as e:
+                self._release_connection(conn, e)
+                raise
+            else:
+                self._release_connection(conn)
+    
     def is_authenticated(self) -> bool:
         """Check if service is authenticated"""
         return self._authenticated
@@ -147,8 +323,16 @@ class BaseEmailService(ABC):
         Returns:
             True if valid, False otherwise
         """
-        import re
         if not email or not isinstance(email, str):
             return False
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(email_pattern, email.strip()))
+        email = email.strip()
+        
+        # Cheap rejects before running the regex engine
+        if len(email) < 6 or '@' not in email:
+            return False
+        local, _, domain = email.rpartition('@')
+        if not local or '.' not in domain:
+            return False
+        
+        return (_EMAIL_LOCAL_RE.match(local) is not None
+                and _EMAIL_DOMAIN_RE.match(domain) is not None)
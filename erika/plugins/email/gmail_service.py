@@ -21,7 +21,7 @@ import re
 import html
 from datetime import datetime, timedelta, timezone as dt_timezone
 from email.mime.text import MIMEText
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -139,6 +139,9 @@ class ErikaGmailService:
     MAX_BODY_LENGTH = 100000
     MAX_SENDER_LENGTH = 255
     
+    # Maximum calls per Gmail batch request
+    BATCH_SIZE = 100
+    
     def __init__(self, user_id: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
         """
         Initialize Gmail service
@@ -170,12 +173,27 @@ class ErikaGmailService:
         Returns:
             True if authentication successful, False otherwise
             
+        Raises:
+            GmailAuthenticationError: If authentication fails
+        """
+        return self.use_credentials(self.load_credentials(client_id, client_secret))
+    
+    def load_credentials(self, client_id: Optional[str] = None, client_secret: Optional[str] = None):
+        """
+        Load (refreshing or running the OAuth2 flow if needed) Gmail credentials
+        
+        Args:
+            client_id: OAuth2 client ID (optional, can use config values)
+            client_secret: OAuth2 client secret (optional, can use config values)
+            
+        Returns:
+            Valid google.oauth2 Credentials
+            
         Raises:
             GmailAuthenticationError: If authentication fails
         """
         try:
             # Import Gmail API libraries
-            from googleapiclient.discovery import build
             from google_auth_oauthlib.flow import InstalledAppFlow
             from google.auth.transport.requests import Request
             
@@ -223,10 +241,7 @@ class ErikaGmailService:
                     creds = flow.run_local_server(port=0)
                     self.token_manager.save_token(creds)
             
-            # Build Gmail service
-            self.service = build('gmail', 'v1', credentials=creds)
-            logger.info(f"Gmail service authenticated successfully for user {self.user_id}")
-            return True
+            return creds
             
         except ImportError as e:
             logger.error(f"Google API client not installed: {e}")
@@ -237,79 +252,137 @@ class ErikaGmailService:
             logger.error(f"Gmail authentication failed for user {self.user_id}: {e}")
             raise GmailAuthenticationError(f"Authentication failed: {e}")
     
-    def get_unread_emails(self, max_results: int = 50, days_back: int = 7) -> List[Dict[str, Any]]:
+    def use_credentials(self, creds) -> bool:
+        """
+        Build this instance's Gmail API client from already-loaded credentials
+        
+        The client owns its own httplib2 connection, which is not thread-safe,
+        so credentials may be shared between instances but the client may not.
+        
+        Raises:
+            GmailAuthenticationError: If the client cannot be built
+        """
+        try:
+            from googleapiclient.discovery import build
+            
+            # (cache_discovery=False skips the file-based discovery cache lookup)
+            self.service = build('gmail', 'v1', credentials=creds, cache_discovery=False)
+            logger.info(f"Gmail service authenticated successfully for user {self.user_id}")
+            return True
+            
+        except ImportError as e:
+            logger.error(f"Google API client not installed: {e}")
+            raise GmailAuthenticationError(f"Google API client libraries not installed: {e}")
+        except Exception as e:
+            logger.error(f"Gmail authentication failed for user {self.user_id}: {e}")
+            raise GmailAuthenticationError(f"Authentication failed: {e}")
+    
+    def get_unread_emails(self, max_results: int = 50, days_back: int = 7,
+                          keywords: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Get unread emails from the last N days
         
         Args:
             max_results: Maximum number of emails to retrieve (default: 50, max: 500)
             days_back: How many days back to search (default: 7, max: 30)
+            keywords: Only return emails matching any of these keywords
+                      (default: the configured gmail_keywords). Matching is
+                      done by Gmail's search, so non-matching emails are
+                      never downloaded.
             
         Returns:
             List of email dictionaries with sanitized content
         """
+        return list(self.iter_unread_emails(max_results, days_back, keywords))
+    
+    def iter_unread_emails(self, max_results: int = 50, days_back: int = 7,
+                           keywords: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield unread emails one at a time as their details are fetched
+        
+        Same arguments as get_unread_emails; lets callers stream results
+        without holding every email body in memory.
+        """
         try:
-            if not self.service:
-                if not self.authenticate():
-                    return []
-            
-            # Validate parameters
-            max_results = min(max(1, max_results), 500)  # Clamp between 1 and 500
-            days_back = min(max(1, days_back), 30)  # Clamp between 1 and 30
-            
-            # Build search query
-            date_filter = (datetime.now() - timedelta(days=days_back)).strftime('%Y/%m/%d')
-            
-            # Search for unread emails
-            query_parts = ['is:unread', f'after:{date_filter}']
-            
-            # Add keyword filters from config (if provided)
-            keywords = self.config.get('gmail_keywords', [])
-            if keywords and isinstance(keywords, list):
-                # Sanitize keywords to prevent injection
-                sanitized_keywords = []
-                for keyword in keywords[:10]:  # Limit to 10 keywords
-                    if isinstance(keyword, str) and len(keyword) <= 100:
-                        sanitized_keywords.append(keyword.strip())
-                if sanitized_keywords:
-                    keyword_query = ' OR '.join([f'"{kw}"' for kw in sanitized_keywords])
-                    query_parts.append(f'({keyword_query})')
-            
-            query = ' '.join(query_parts)
-            
-            logger.info(f"🔍 Searching Gmail with query: {query}")
-            
-            # Call Gmail API
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=max_results
-            ).execute()
-            
-            messages = results.get('messages', [])
-            
-            if not messages:
-                logger.info("📭 No unread emails found")
-                return []
-            
-            logger.info(f"📬 Found {len(messages)} unread emails")
-            
-            # Get full message details with sanitization
-            emails = []
-            for msg in messages:
-                try:
-                    email_data = self._get_email_details(msg['id'])
-                    if email_data:
-                        emails.append(email_data)
-                except Exception as e:
-                    logger.warning(f"Error processing email {msg.get('id', 'unknown')}: {e}")
-                    continue
-            
-            return emails
-            
+            messages = self.search_unread(max_results, days_back, keywords)
         except Exception as e:
             logger.error(f"❌ Error fetching emails: {e}", exc_info=True)
-            return []
+            return
+        
+        yield from self.iter_email_details(messages)
+    
+    def iter_email_details(self, messages: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield full, sanitized details for message stubs from search_unread
+        
+        Emails that fail to load are logged and skipped.
+        """
+        for msg in messages:
+            try:
+                email_data = self._get_email_details(msg['id'])
+                if email_data:
+                    yield email_data
+            except Exception as e:
+                logger.warning(f"Error processing email {msg.get('id', 'unknown')}: {e}")
+                continue
+    
+    def search_unread(self, max_results: int, days_back: int,
+                      keywords: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """
+        Run the unread-email search and return the matching message stubs
+        
+        Unlike iter_unread_emails, errors (including authentication
+        failures) propagate to the caller.
+        """
+        if not self.service:
+            if not self.authenticate():
+                return []
+        
+        # Validate parameters
+        max_results = min(max(1, max_results), 500)  # Clamp between 1 and 500
+        days_back = min(max(1, days_back), 30)  # Clamp between 1 and 30
+        
+        # Build search query
+        date_filter = (datetime.now() - timedelta(days=days_back)).strftime('%Y/%m/%d')
+        
+        # Search for unread emails
+        query_parts = ['is:unread', f'after:{date_filter}']
+        
+        # Add keyword filters (explicit keywords, else from config)
+        if keywords is None:
+            keywords = self.config.get('gmail_keywords', [])
+        if keywords and isinstance(keywords, list):
+            # Sanitize keywords to prevent injection
+            sanitized_keywords = []
+            for keyword in keywords[:10]:  # Limit to 10 keywords
+                if isinstance(keyword, str) and len(keyword) <= 100:
+                    # Quotes would break out of the quoted search term
+                    keyword = keyword.replace('"', '').strip()
+                    if keyword:
+                        sanitized_keywords.append(keyword)
+            if sanitized_keywords:
+                keyword_query = ' OR '.join([f'"{kw}"' for kw in sanitized_keywords])
+                query_parts.append(f'({keyword_query})')
+        
+        query = ' '.join(query_parts)
+        
+        logger.info(f"🔍 Searching Gmail with query: {query}")
+        
+        # Call Gmail API
+        results = self.service.users().messages().list(
+            userId='me',
+            q=query,
+            maxResults=max_results
+        ).execute()
+        
+        messages = results.get('messages', [])
+        
+        if not messages:
+            logger.info("📭 No unread emails found")
+        else:
+            logger.info(f"📬 Found {len(messages)} unread emails")
+        
+        return messages
     
     def _get_email_details(self, message_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -331,11 +404,27 @@ class ErikaGmailService:
                 format='full'
             ).execute()
             
+            return self._message_to_email(message_id, message)
+            
+        except Exception as e:
+            logger.error(f"Error getting email details for message {message_id}: {e}")
+            return None
+    
+    def _message_to_email(self, message_id: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Build the sanitized email dictionary for a fetched Gmail message
+        
+        Args:
+            message_id: Gmail message ID
+            message: Full-format message resource
+            
+        Returns:
+            Dictionary with sanitized email details, or None if error
+        """
+        try:
             # Extract headers
             headers = message.get('payload', {}).get('headers', [])
-            subject = self._get_header(headers, 'Subject')
-            sender = self._get_header(headers, 'From')
-            date_str = self._get_header(headers, 'Date')
+            subject, sender, date_str = self._get_headers(headers, 'Subject', 'From', 'Date')
             
             # Extract and sanitize body
             body = self._get_email_body(message.get('payload', {}))
@@ -402,17 +491,77 @@ class ErikaGmailService:
             logger.error(f"Error getting email details for message {message_id}: {e}")
             return None
     
-    def _get_header(self, headers: List[Dict[str, str]], name: str) -> str:
-        """Extract header value by name"""
-        if not headers or not isinstance(headers, list):
-            return ""
+    def get_emails_by_ids(self, email_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch many emails with batched API requests
+        
+        Args:
+            email_ids: Gmail message IDs
+            
+        Returns:
+            Dictionary of message ID -> email dictionary (missing IDs omitted)
+        """
+        if not self.service:
+            if not self.authenticate():
+                return {}
+        
+        message_ids = [mid for mid in dict.fromkeys(email_ids) if mid and isinstance(mid, str)]
+        messages: Dict[str, Dict[str, Any]] = {}
+        
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"Error fetching email {request_id}: {exception}")
+            else:
+                messages[request_id] = response
+        
+        # Gmail accepts at most 100 calls per batch request
+        for start in range(0, len(message_ids), self.BATCH_SIZE):
+            chunk = message_ids[start:start + self.BATCH_SIZE]
+            batch = self.service.new_batch_http_request(callback=_collect)
+            for message_id in chunk:
+                batch.add(
+                    self.service.users().messages().get(userId='me', id=message_id, format='full'),
+                    request_id=message_id
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                # Keep emails from batches that already succeeded
+                logger.warning(f"Error fetching batch of {len(chunk)} emails: {e}")
+                continue
+        
+        emails = {}
+        for message_id in message_ids:
+            if message_id in messages:
+                email_data = self._message_to_email(message_id, messages[message_id])
+                if email_data:
+                    emails[message_id] = email_data
+        return emails
+    
+    def _get_headers(self, headers: List[Dict[str, str]], *names: str) -> List[str]:
+        """
+        Extract several header values by name in a single pass
+        
+        Names are matched case-insensitively; each header name is lowercased
+        once. The first string value for a name wins; missing headers are "".
+        """
+        wanted = [name.lower() for name in names]
+        found: Dict[str, str] = {}
         
-        for header in headers:
-            if isinstance(header, dict) and header.get('name', '').lower() == name.lower():
+        if headers and isinstance(headers, list):
+            for header in headers:
+                if not isinstance(header, dict):
+                    continue
+                key = header.get('name', '').lower()
+                if key in found or key not in wanted:
+                    continue
                 value = header.get('value', '')
                 if isinstance(value, str):
-                    return value
-        return ""
+                    found[key] = value
+                    if len(found) == len(wanted):
+                        break
+        
+        return [found.get(key, "") for key in wanted]
     
     def _get_email_body(self, payload: Dict[str, Any]) -> str:
         """
@@ -11,10 +11,11 @@ Version: 1.0.0
 
 import logging
 import imaplib
+import time
 import email
 import email.header
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from email.mime.text import MIMEText
 import re
 
@@ -27,6 +28,16 @@ from .base_email_service import (
 
 logger = logging.getLogger(__name__)
 
+# Servers may drop a session after 30 minutes of inactivity (RFC 3501),
+# so an idle connection is probed with NOOP before it is reused
+IMAP_NOOP_INTERVAL = 25 * 60  # seconds
+
+# UID data item in a FETCH response, e.g. b'3 (UID 1234 BODY[] {5120}'
+_FETCH_UID_RE = re.compile(rb'\bUID (\d+)')
+
+# Errors that mean the session is gone and must be rebuilt
+_IMAP_CONNECTION_ERRORS = (imaplib.IMAP4.abort, OSError)
+
 
 class IMAPService(BaseEmailService):
     """
@@ -60,6 +71,9 @@ class IMAPService(BaseEmailService):
         self.imap_password = self.config.get('imap_password')
         self.use_ssl = self.config.get('use_ssl', True)
         self.connection = None
+        self._last_used = 0.0
+        # INBOX UIDVALIDITY the cached UIDs belong to
+        self._uid_validity: Optional[bytes] = None
     
     def authenticate(self, **kwargs) -> bool:
         """
@@ -94,6 +108,7 @@ class IMAPService(BaseEmailService):
             # Authenticate
             self.connection.login(username, password)
             self._authenticated = True
+            self._last_used = time.monotonic()
             logger.info(f"✅ IMAP authentication successful: {self.imap_server}")
             return True
             
@@ -108,6 +123,60 @@ class IMAPService(BaseEmailService):
             logger.error(error_msg)
             raise EmailAuthenticationError(error_msg)
     
+    def _get_connection(self) -> imaplib.IMAP4:
+        """
+        Return the cached IMAP session, reconnecting lazily
+        
+        A session idle for IMAP_NOOP_INTERVAL is probed with NOOP first and
+        rebuilt if the server has dropped it.
+        """
+        if self._authenticated and self.connection:
+            if time.monotonic() - self._last_used >= IMAP_NOOP_INTERVAL:
+                try:
+                    self.connection.noop()
+                    self._last_used = time.monotonic()
+                except (imaplib.IMAP4.error,) + _IMAP_CONNECTION_ERRORS as e:
+                    logger.info(f"IMAP session expired, reconnecting: {e}")
+                    self._drop_connection()
+        
+        if not self._authenticated or not self.connection:
+            self.authenticate()
+        return self.connection
+    
+    def _release_connection(self, conn: imaplib.IMAP4, error: Optional[BaseException] = None):
+        """Keep the session for the next call unless it broke while in use"""
+        if isinstance(error, _IMAP_CONNECTION_ERRORS):
+            logger.warning(f"IMAP connection lost: {error}")
+            self._drop_connection()
+        else:
+            self._last_used = time.monotonic()
+    
+    def _drop_connection(self):
+        """Forget the current session so the next call reconnects"""
+        connection, self.connection = self.connection, None
+        self._authenticated = False
+        if connection:
+            try:
+                connection.logout()
+            except Exception:
+                pass
+    
+    def _select_inbox(self, conn: imaplib.IMAP4):
+        """
+        Select INBOX and check that cached UIDs still refer to it
+        
+        Email IDs are UIDs, which stay fixed across EXPUNGEs and sessions
+        unless the server changes the mailbox's UIDVALIDITY; when it does,
+        the details cache is cleared.
+        """
+        conn.select('INBOX')
+        status, data = conn.response('UIDVALIDITY')
+        validity = data[0] if data and data[0] else None
+        if validity is not None and validity != self._uid_validity:
+            if self._uid_validity is not None:
+                self.clear_email_details_cache()
+            self._uid_validity = validity
+    
     def get_unread_emails(
         self,
         max_results: int = 50,
@@ -123,74 +192,173 @@ class IMAPService(BaseEmailService):
         Returns:
             List of email dictionaries
         """
-        if not self._authenticated or not self.connection:
-            if not self.authenticate():
-                return []
-        
         try:
-            # Select INBOX
-            self.connection.select('INBOX')
+            with self.use_connection() as conn:
+                # Select INBOX
+                self._select_inbox(conn)
             
-            # Build search query for unread emails
-            date_filter = (datetime.now() - timedelta(days=days_back)).strftime('%d-%b-%Y')
-            search_query = f'(UNSEEN SINCE {date_filter})'
+                # Build search query for unread emails
+                date_filter = (datetime.now() - timedelta(days=days_back)).strftime('%d-%b-%Y')
+                search_query = f'(UNSEEN SINCE {date_filter})'
             
-            # Search for unread emails
-            status, message_ids = self.connection.search(None, search_query)
+                # Search for unread emails (UIDs, so IDs survive EXPUNGEs)
+                status, message_ids = conn.uid('SEARCH', search_query)
             
-            if status != 'OK' or not message_ids[0]:
-                logger.info("📭 No unread emails found")
-                return []
+                if status != 'OK' or not message_ids[0]:
+                    logger.info("📭 No unread emails found")
+                    return []
             
-            # Get message IDs
-            msg_ids = message_ids[0].split()
-            msg_ids = msg_ids[:max_results]  # Limit results
+                # Get message UIDs
+                msg_ids = message_ids[0].split()
+                msg_ids = msg_ids[:max_results]  # Limit results
             
-            emails = []
-            for msg_id in msg_ids:
-                try:
-                    # Fetch email
-                    status, msg_data = self.connection.fetch(msg_id, '(RFC822)')
-                    
-                    if status != 'OK' or not msg_data[0]:
-                        continue
-                    
-                    # Parse email
-                    email_body = msg_data[0][1]
-                    email_message = email.message_from_bytes(email_body)
-                    
-                    # Extract headers
-                    subject = self._decode_header(email_message.get('Subject', ''))
-                    sender = self._decode_header(email_message.get('From', ''))
-                    date_str = email_message.get('Date', '')
-                    
-                    # Extract body
-                    body = self._extract_body(email_message)
+                emails = []
+                for msg_id in msg_ids:
+                    try:
+                        # Fetch email
+                        status, msg_data = conn.uid('FETCH', msg_id, '(RFC822)')
                     
-                    # Create email dict
-                    email_dict = {
-                        'id': msg_id.decode('utf-8'),
-                        'thread_id': None,  # IMAP doesn't have thread IDs
-                        'subject': subject or 'No subject',
-                        'sender': sender or 'Unknown',
-                        'date': date_str,
-                        'body': body,
-                        'provider': 'imap'
-                    }
+                        if status != 'OK' or not msg_data[0]:
+                            continue
                     
-                    emails.append(email_dict)
+                        emails.append(self._parse_message(msg_id.decode('utf-8'), msg_data[0][1]))
                     
-                except Exception as e:
-                    logger.warning(f"Error processing email {msg_id}: {e}")
-                    continue
+                    except _IMAP_CONNECTION_ERRORS:
+                        # Let use_connection see it and drop the session
+                        raise
+                    except Exception as e:
+                        logger.warning(f"Error processing email {msg_id}: {e}")
+                        continue
             
-            logger.info(f"📬 Found {len(emails)} unread emails via IMAP")
-            return emails
+                logger.info(f"📬 Found {len(emails)} unread emails via IMAP")
+                return emails
             
+        except EmailAuthenticationError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching emails via IMAP: {e}")
             return []
     
+    def _fetch_email_by_id(self, email_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one email by UID without scanning the inbox
+        
+        Uses UID FETCH with BODY.PEEK[] so the message is not marked as read.
+        """
+        # Only a plain UID; anything else (e.g. '1:*') would be passed to
+        # FETCH as a UID set or command syntax
+        if not isinstance(email_id, str) or not email_id.isdigit():
+            return None
+        
+        try:
+            with self.use_connection() as conn:
+                self._select_inbox(conn)
+                status, msg_data = conn.uid('FETCH', email_id, '(BODY.PEEK[])')
+            
+                if status != 'OK' or not msg_data or not isinstance(msg_data[0], tuple):
+                    return None
+            
+                return self._parse_message(email_id, msg_data[0][1])
+            
+        except EmailAuthenticationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching email {email_id} via IMAP: {e}")
+            return None
+    
+    def get_emails_by_ids(self, email_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several emails with a single IMAP UID FETCH command
+        
+        Cached emails are served from the details cache; the rest are
+        fetched together with BODY.PEEK[] (not marked as read).
+        """
+        emails = {}
+        missing = []
+        now = time.monotonic()
+        for email_id in dict.fromkeys(email_ids):
+            cached = self._cached_email_details(email_id, now)
+            if cached is not None:
+                emails[email_id] = cached
+            elif isinstance(email_id, str) and email_id.isdigit():
+                missing.append(email_id)
+        
+        if not missing:
+            return emails
+        
+        try:
+            with self.use_connection() as conn:
+                self._select_inbox(conn)
+                status, msg_data = conn.uid('FETCH', ','.join(missing), '(BODY.PEEK[])')
+            
+                if status != 'OK':
+                    return emails
+            
+                requested = set(missing)
+                for email_id, raw in self._iter_uid_messages(msg_data):
+                    if email_id not in requested:
+                        continue
+                    try:
+                        email_dict = self._parse_message(email_id, raw)
+                    except Exception as e:
+                        logger.warning(f"Error processing email {email_id}: {e}")
+                        continue
+                    emails[email_id] = email_dict
+                    self._cache_email_details(email_id, email_dict, now)
+            
+        except EmailAuthenticationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching emails via IMAP: {e}")
+        
+        return emails
+    
+    def _iter_uid_messages(self, msg_data: List[Any]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Pair each message body in a UID FETCH response with its UID
+        
+        Each message arrives as (b'<num> (UID <uid> BODY[] {size}', raw)
+        followed by b')'; servers may instead send the UID after the
+        literal, in that trailing element. Messages whose UID cannot be
+        found are skipped rather than guessed.
+        """
+        pending = None
+        for item in msg_data:
+            if isinstance(item, tuple):
+                match = _FETCH_UID_RE.search(item[0])
+                if match:
+                    pending = None
+                    yield match.group(1).decode('ascii'), item[1]
+                else:
+                    pending = item[1]
+            elif pending is not None and isinstance(item, bytes):
+                match = _FETCH_UID_RE.search(item)
+                if match:
+                    yield match.group(1).decode('ascii'), pending
+                pending = None
+    
+    def _parse_message(self, email_id: str, raw_message: bytes) -> Dict[str, Any]:
+        """Parse a raw RFC822 message into an email dictionary"""
+        email_message = email.message_from_bytes(raw_message)
+        
+        # Extract headers
+        subject = self._decode_header(email_message.get('Subject', ''))
+        sender = self._decode_header(email_message.get('From', ''))
+        date_str = email_message.get('Date', '')
+        
+        # Extract body
+        body = self._extract_body(email_message)
+        
+        return {
+            'id': email_id,
+            'thread_id': None,  # IMAP doesn't have thread IDs
+            'subject': subject or 'No subject',
+            'sender': sender or 'Unknown',
+            'date': date_str,
+            'body': body,
+            'provider': 'imap'
+        }
+    
     def send_email(
         self,
         to: str,
@@ -17,12 +17,31 @@ Version: 1.0.0
 """
 
 import logging
+import re
 from typing import Dict, Any, Optional, List
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 
 logger = logging.getLogger(__name__)
 
+# Sender domain extraction
+_SENDER_DOMAIN_RE = re.compile(r'@([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+
+# Personal email domains
+_PERSONAL_DOMAINS = frozenset([
+    'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+    'icloud.com', 'protonmail.com', 'aol.com'
+])
+
+# Professional-role claims, compiled into one alternation so the body is
+# scanned once instead of once per keyword
+_PROFESSIONAL_RE = re.compile('|'.join([
+    r'recruiter', r'hiring manager', r'hr department', r'human resources',
+    r'company', r'corporation', r'inc\.', r'llc', r'ltd',
+    r'financial advisor', r'bank', r'investment', r'legal counsel',
+    r'attorney', r'law firm', r'accountant', r'cpa'
+]), re.IGNORECASE)
+
 
 class AresBridge:
     """
@@ -162,36 +181,19 @@ class AresBridge:
             True if domain mismatch detected, False otherwise
         """
         try:
-            import re
-            
             # Extract domain from sender
-            email_match = re.search(r'@([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', sender)
+            email_match = _SENDER_DOMAIN_RE.search(sender)
             if not email_match:
                 return False
             
             domain = email_match.group(1).lower()
             
-            # Personal email domains
-            personal_domains = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 
-                              'icloud.com', 'protonmail.com', 'aol.com']
-            
-            if domain not in personal_domains:
+            if domain not in _PERSONAL_DOMAINS:
                 return False  # Corporate domain, no mismatch
             
             # Check if body claims professional role
-            professional_keywords = [
-                r'recruiter', r'hiring manager', r'hr department', r'human resources',
-                r'company', r'corporation', r'inc\.', r'llc', r'ltd',
-                r'financial advisor', r'bank', r'investment', r'legal counsel',
-                r'attorney', r'law firm', r'accountant', r'cpa'
-            ]
-            
-            body_lower = body.lower()
-            for keyword in professional_keywords:
-                if re.search(keyword, body_lower):
-                    return True  # Mismatch: professional claim with personal domain
-            
-            return False
+            # (mismatch: professional claim with personal domain)
+            return _PROFESSIONAL_RE.search(body) is not None
             
         except Exception as e:
             logger.debug(f"Error detecting domain mismatch: {e}")